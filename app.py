@@ -1,15 +1,19 @@
 """
 Wrapper to import the main dashboard app with error handling
 """
+import functools
+import importlib
 import traceback
-from shiny import App, ui
 
-try:
-    # Use the full dashboard app
-    from supabase_shiny import app
-except Exception as e:
-    error_msg = str(e)
-    error_tb = traceback.format_exc()
+# Only the tail of the traceback is useful (and it dominates the page size)
+MAX_TRACEBACK_LINES = 50
+
+
+@functools.lru_cache(maxsize=1)
+def _build_error_app(error_msg: str, error_tb: str):
+    """Build the fallback error page once per distinct error."""
+    # Only pull in the UI helpers when the error page is actually needed
+    from shiny import App, ui
 
     error_ui = ui.page_fluid(
         ui.h1("❌ Import Error"),
@@ -22,4 +26,18 @@ except Exception as e:
     def error_server(input, output, session):
         pass
 
-    app = App(error_ui, error_server)
+    return App(error_ui, error_server)
+
+
+def _load():
+    """Import the full dashboard app, falling back to an error page."""
+    try:
+        # Use the full dashboard app
+        return importlib.import_module("supabase_shiny").app
+    except Exception as e:
+        tb_lines = traceback.format_exc().splitlines()
+        error_tb = "\n".join(tb_lines[-MAX_TRACEBACK_LINES:])
+        return _build_error_app(str(e), error_tb)
+
+
+app = _load()
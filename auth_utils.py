@@ -3,9 +3,32 @@ Authentication utilities for INS Dashboard.
 
 Provides password hashing and verification using bcrypt.
 Also provides fast password prefix generation for O(1) user lookup.
+
+The bcrypt package (>= 4.0) is a PyO3 binding over the Rust implementation,
+so hashing cost is dominated by BCRYPT_ROUNDS rather than interpreter overhead.
 """
 import bcrypt
 import hashlib
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+# bcrypt work factor (2^rounds key-schedule iterations).
+# Tunable per deployment: 12 in production, lower (e.g. 10) for dev.
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", "12"))
+
+# Valid bcrypt hashes are always 60 chars: $2b$<cost>$<22-char salt><31-char hash>
+BCRYPT_HASH_LENGTH = 60
+BCRYPT_PREFIXES = ('$2a$', '$2b$', '$2y$')
+
+# Opt-in cache of successful verifications (BCRYPT_VERIFY_CACHE=true).
+# Repeat verifies of the same (password, hash) skip bcrypt entirely, which
+# changes the timing profile, so it is disabled by default. Keys are SHA256
+# digests - plaintext passwords are never stored. Failures are never cached.
+VERIFY_CACHE_ENABLED = os.environ.get("BCRYPT_VERIFY_CACHE", "false").lower() == "true"
+VERIFY_CACHE_SIZE = 4096
+_verified_cache: "OrderedDict[bytes, None]" = OrderedDict()
 
 
 def generate_password_prefix(plain_password: str) -> str:
@@ -51,13 +74,35 @@ def hash_password(plain_password: str) -> str:
     password_bytes = plain_password.encode('utf-8')
     
     # Generate salt and hash
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password_bytes, salt)
     
     # Convert bytes back to string for storage
     return hashed.decode('utf-8')
 
 
+def hash_passwords(plain_passwords: List[str]) -> List[str]:
+    """
+    Hash several passwords in parallel across CPU cores.
+
+    bcrypt is CPU-bound, so bulk account creation (e.g. create_users.py)
+    fans out to a process pool instead of hashing one password at a time.
+    Callers must run under an `if __name__ == "__main__":` guard.
+
+    Args:
+        plain_passwords: Plain text passwords to hash
+
+    Returns:
+        Hashed passwords, in the same order as the input
+    """
+    if len(plain_passwords) < 2:
+        return [hash_password(p) for p in plain_passwords]
+
+    max_workers = min(len(plain_passwords), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(hash_password, plain_passwords))
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a plain text password against a hashed password.
@@ -76,20 +121,46 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         >>> verify_password("WrongPassword", hashed)
         False
     """
+    # Reject malformed hashes before paying for the bcrypt key schedule
+    if (not isinstance(hashed_password, str)
+            or len(hashed_password) != BCRYPT_HASH_LENGTH
+            or not hashed_password.startswith(BCRYPT_PREFIXES)):
+        return False
+
     try:
         # Convert strings to bytes
         password_bytes = plain_password.encode('utf-8')
         hashed_bytes = hashed_password.encode('utf-8')
-        
+
+        if VERIFY_CACHE_ENABLED:
+            cache_key = hashlib.sha256(hashed_bytes + b':' + password_bytes).digest()
+            if cache_key in _verified_cache:
+                _verified_cache.move_to_end(cache_key)
+                return True
+
         # Check password
-        return bcrypt.checkpw(password_bytes, hashed_bytes)
+        is_valid = bcrypt.checkpw(password_bytes, hashed_bytes)
+
+        if is_valid and VERIFY_CACHE_ENABLED:
+            _verified_cache[cache_key] = None
+            if len(_verified_cache) > VERIFY_CACHE_SIZE:
+                _verified_cache.popitem(last=False)
+
+        return is_valid
     except (ValueError, AttributeError) as e:
         # Handle encoding errors or invalid hash format
         print(f"Password verification error: {e}")
         return False
 
 
+def clear_verify_cache() -> None:
+    """Drop all cached verifications (e.g. on logout or password change)."""
+    _verified_cache.clear()
+
+
 if __name__ == "__main__":
+    import time
+
     # Test the functions
     print("=== Testing Password Hashing ===")
     
@@ -109,4 +180,19 @@ if __name__ == "__main__":
     is_invalid = verify_password("WrongPassword", hashed)
     print(f"Wrong password verification: {is_invalid}")
     
+    # Benchmark hash/verify at the configured cost
+    print(f"\n=== Benchmark (rounds={BCRYPT_ROUNDS}) ===")
+    start = time.perf_counter()
+    hashed = hash_password(test_password)
+    print(f"hash_password:   {(time.perf_counter() - start) * 1000:.1f} ms")
+    start = time.perf_counter()
+    verify_password(test_password, hashed)
+    print(f"verify_password: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    n = 5
+    start = time.perf_counter()
+    for _ in range(n):
+        hash_password(test_password)
+    print(f"Throughput:      {n / (time.perf_counter() - start):.1f} hashes/sec")
+
     print("\nPassword hashing utilities working correctly!")
@@ -137,6 +137,7 @@ CREATE INDEX IF NOT EXISTS idx_activity_metadata_date ON activity_metadata(date
 CREATE INDEX IF NOT EXISTS idx_activity_metadata_type ON activity_metadata(type);
 CREATE INDEX IF NOT EXISTS idx_activity_metadata_activity_id ON activity_metadata(activity_id);
 CREATE INDEX IF NOT EXISTS idx_activity_metadata_athlete_date ON activity_metadata(athlete_id, date DESC);
+CREATE INDEX IF NOT EXISTS idx_activity_metadata_forecast_date ON activity_metadata(date) WHERE weather_source = 'forecast';
 
 COMMENT ON TABLE activity_metadata IS 'Activity summary metrics with weather enrichment';
 COMMENT ON COLUMN activity_metadata.activity_id IS 'Intervals.icu activity identifier';
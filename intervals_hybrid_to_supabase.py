@@ -15,14 +15,17 @@ Usage:
     python intervals_hybrid_to_supabase.py --oldest 2024-01-01 --newest 2024-12-31 --dry-run
 
     # BULK IMPORT: Parallel import with wellness, skip weather (12-15 athletes safe)
-    python intervals_hybrid_to_supabase.py --athlete "Matthew Beaudet" --oldest 2021-01-01 --newest 2024-12-31 --wellness-oldest 2021-01-01 --wellness-newest 2024-12-31 --skip-weather &
-    python intervals_hybrid_to_supabase.py --athlete "Kevin Robertson" --oldest 2021-01-01 --newest 2024-12-31 --wellness-oldest 2021-01-01 --wellness-newest 2024-12-31 --skip-weather &
-    # ... repeat for all athletes (up to 12-15 parallel processes)
-    wait  # Wait for all to complete
+    python intervals_hybrid_to_supabase.py --oldest 2021-01-01 --newest 2024-12-31 --wellness-oldest 2021-01-01 --wellness-newest 2024-12-31 --skip-weather --parallel-athletes 12
 
     # Weather backfill only (check forecast → archive updates)
     python intervals_hybrid_to_supabase.py --backfill-only
 
+    # Quiet mode: only warnings/errors + final summary (CI, log sinks)
+    python intervals_hybrid_to_supabase.py --oldest 2024-01-01 --newest 2024-12-31 --quiet
+
+    # Cron: start at a random point in the next 5 minutes (off the :00 peak)
+    python intervals_hybrid_to_supabase.py --oldest 2024-01-01 --newest 2024-12-31 --jitter-seconds 300
+
 Features:
 - Duplicate prevention: Skips already-imported activities
 - Batch retry: Exponential backoff for failed inserts
@@ -36,22 +39,60 @@ import os
 import sys
 import json
 import argparse
+import atexit
+import queue
+import random
+import bisect
+import functools
+import gzip
+import inspect
 import time
-from datetime import datetime, date, timedelta
+import multiprocessing
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, date, timedelta, timezone
 from dotenv import load_dotenv
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
+from urllib3.util.retry import Retry
+import fitdecode
 from fitparse import FitFile
 import io
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, FrozenSet, Optional, Tuple, Union
+import ijson
+import numpy as np
+import orjson
 import pandas as pd
 
 # Import algorithme temps actif (Strava-like)
-from moving_time import compute_moving_time_strava
+from moving_time import MOVING_TIME_INPUTS, compute_moving_time_strava_arrays
 
 load_dotenv(".env", override=True)
 
 
+
+def records_to_columns(records: List[Dict], columns: List[str]) -> Dict[str, np.ndarray]:
+    """
+    Convertit des records (liste de dicts) en colonnes NumPy float64 (SoA).
+
+    Une seule passe par colonne; les clés absentes ou None deviennent NaN.
+    Les calculs numériques (temps actif, FC moyenne) travaillent sur ces
+    colonnes au lieu d'itérer sur les dicts.
+    """
+    n = len(records)
+    return {
+        col: np.fromiter(
+            (np.nan if (v := rec.get(col)) is None else v for rec in records),
+            dtype=np.float64,
+            count=n
+        )
+        for col in columns
+    }
+
+
 def compute_t_active_for_records(records: List[Dict], activity_type: str = "run") -> List[Dict]:
     """
     Calcule t_active_sec pour une liste de records via algorithme Strava.
@@ -66,16 +107,18 @@ def compute_t_active_for_records(records: List[Dict], activity_type: str = "run"
     if not records:
         return records
 
-    # Convertir en DataFrame temporaire
-    df = pd.DataFrame(records)
+    # Colonnes float64 passées directement à l'algorithme (pas de DataFrame)
+    columns = records_to_columns(records, MOVING_TIME_INPUTS)
 
     # Calculer t_active_sec via algorithme Strava
     try:
-        t_active = compute_moving_time_strava(df, activity_type=activity_type)
+        t_active = compute_moving_time_strava_arrays(columns, activity_type=activity_type)
 
-        # Ajouter à chaque record
-        for i, rec in enumerate(records):
-            rec['t_active_sec'] = float(t_active.iloc[i]) if i < len(t_active) else 0.0
+        # Ajouter à chaque record (un seul passage, sans .iloc par ligne)
+        for rec, value in zip(records, t_active.tolist()):
+            rec['t_active_sec'] = value
+        for rec in records[len(t_active):]:
+            rec['t_active_sec'] = 0.0
     except Exception:
         # Fallback : marquer tout comme actif
         for rec in records:
@@ -89,6 +132,123 @@ BASE_URL = "https://intervals.icu/api/v1"
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
 SUPABASE_KEY = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
 BATCH_SIZE = 500
+EXISTING_IDS_CHUNK_SIZE = 200  # activity_ids per duplicate-check query
+
+# Jitter du backoff urllib3: le paramètre n'existe qu'à partir d'urllib3 2.0.
+# Avec 1.26 (encore épinglé par certains requests/botocore), backoff sans jitter
+URLLIB3_RETRY_JITTER = {"backoff_jitter": 0.5} if "backoff_jitter" in inspect.signature(Retry).parameters else {}
+
+# Session Supabase partagée pour les appels RPC (keep-alive: TCP/TLS réutilisés)
+SUPABASE_SESSION = requests.Session()
+SUPABASE_SESSION.headers.update({
+    "apikey": SUPABASE_KEY,
+    "Authorization": f"Bearer {SUPABASE_KEY}",
+    "Content-Type": "application/json"
+})
+# RPCs on this session are idempotent (upserts / view refreshes), so transient
+# PostgREST 502/503/504 are retried with backoff instead of failing the run
+SUPABASE_RPC_RETRY = Retry(
+    total=3,
+    backoff_factor=1.5,
+    status_forcelist=[502, 503, 504],
+    allowed_methods=["POST"],
+    raise_on_status=False
+)
+SUPABASE_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4, pool_maxsize=8, max_retries=SUPABASE_RPC_RETRY
+))
+
+# Session Supabase pour les lectures et les upserts REST (merge-duplicates
+# sur une clé unique: rejouer un POST est sans effet). Les retries
+# (429 + erreurs serveur, timeouts) sont faits par urllib3: backoff
+# exponentiel avec jitter (pas de vagues synchronisées entre threads
+# d'activités) et Retry-After respecté sur les 429.
+SUPABASE_REST_RETRY = Retry(
+    total=3,
+    backoff_factor=1,
+    **URLLIB3_RETRY_JITTER,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=["GET", "POST"],
+    respect_retry_after_header=True,
+    raise_on_status=False
+)
+SUPABASE_REST_SESSION = requests.Session()
+SUPABASE_REST_SESSION.headers.update({
+    "apikey": SUPABASE_KEY,
+    "Authorization": f"Bearer {SUPABASE_KEY}"
+})
+SUPABASE_REST_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4, pool_maxsize=16, max_retries=SUPABASE_REST_RETRY
+))
+
+# Session pour les écritures NON idempotentes: inserts simples dans activity /
+# activity_intervals (pas de clé unique) et RPC ingest_activity(ies). Un POST
+# rejoué après un commit dont la réponse est perdue dupliquerait les lignes:
+# seules les erreurs de connexion (requête jamais envoyée) sont réessayées.
+SUPABASE_INSERT_RETRY = Retry(
+    total=3,
+    connect=3,
+    read=0,
+    status=0,
+    backoff_factor=1,
+    **URLLIB3_RETRY_JITTER,
+    allowed_methods=["GET"],
+    raise_on_status=False
+)
+SUPABASE_INSERT_SESSION = requests.Session()
+SUPABASE_INSERT_SESSION.headers.update({
+    "apikey": SUPABASE_KEY,
+    "Authorization": f"Bearer {SUPABASE_KEY}"
+})
+SUPABASE_INSERT_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4, pool_maxsize=16, max_retries=SUPABASE_INSERT_RETRY
+))
+
+# Corps gzip (niveau 1: peu de CPU, JSON très répétitif) pour les gros POST
+# de records. Opt-in: la passerelle Supabase doit accepter
+# Content-Encoding: gzip sur les requêtes (SUPABASE_GZIP_BODIES=true)
+SUPABASE_GZIP_BODIES = os.environ.get("SUPABASE_GZIP_BODIES", "false").lower() == "true"
+SUPABASE_GZIP_LEVEL = 1
+
+def supabase_body(payload, headers: dict) -> Tuple[bytes, dict]:
+    """Sérialiser un corps JSON (orjson), compressé en gzip si SUPABASE_GZIP_BODIES
+
+    payload peut être déjà sérialisé (bytes).
+    """
+    body = payload if isinstance(payload, bytes) else orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    if not SUPABASE_GZIP_BODIES:
+        return body, headers
+    return gzip.compress(body, compresslevel=SUPABASE_GZIP_LEVEL), {**headers, "Content-Encoding": "gzip"}
+
+# Concurrent weather lookups (backfill + per-activity weather/air quality)
+WEATHER_WORKERS = int(os.environ.get("WEATHER_WORKERS", "8"))
+
+# Session HTTP partagée pour Intervals.icu et Open-Meteo (keep-alive + pool
+# dimensionné pour les appels météo concurrents). Chaque worker peut avoir
+# une requête météo et une requête qualité de l'air en vol: avec un pool plus
+# petit, urllib3 jette les connexions en trop et refait un handshake TLS.
+HTTP_POOL_MAXSIZE = max(16, 2 * WEATHER_WORKERS)
+HTTP_SESSION = requests.Session()
+HTTP_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=8, pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=0
+))
+
+# Intervals.icu (préfixe plus long: prioritaire sur l'adapter ci-dessus).
+# Les GET wellness/activités/intervals n'avaient aucun retry alors que les
+# threads d'activités et de wellness y tapent en même temps: 429 (avec
+# Retry-After) et 502/503/504 sont retentés par urllib3, avec jitter.
+INTERVALS_RETRY = Retry(
+    total=3,
+    backoff_factor=0.5,
+    **URLLIB3_RETRY_JITTER,
+    status_forcelist=[429, 502, 503, 504],
+    allowed_methods=["GET"],
+    respect_retry_after_header=True,
+    raise_on_status=False
+)
+HTTP_SESSION.mount("https://intervals.icu", HTTPAdapter(
+    pool_connections=1, pool_maxsize=32, max_retries=INTERVALS_RETRY
+))
 
 # Weather API timeouts
 OM_TIMEOUT = float(os.environ.get("OM_TIMEOUT", "10"))
@@ -105,6 +265,14 @@ class Colors:
     BOLD = '\033[1m'
     END = '\033[0m'
 
+# Pas de codes ANSI quand la sortie n'est pas un terminal (Lambda/CloudWatch, CI)
+if not sys.stdout.isatty():
+    for _color in ('GREEN', 'RED', 'YELLOW', 'BLUE', 'CYAN', 'BOLD', 'END'):
+        setattr(Colors, _color, '')
+
+# --quiet: n'affiche que les warnings/erreurs et le résumé final
+QUIET = False
+
 # Statistiques globales (Phase 1 Enhanced)
 stats = {
     # Existing
@@ -124,6 +292,7 @@ stats = {
     'weather_from_archive': 0,
     'weather_from_forecast': 0,
     'weather_missing': 0,     # No weather after all retries
+    'weather_backfill_skipped': 0,  # Archive not more complete than stored forecast
 
     'hr_monitor_used': 0,     # Activities with HR records
     'hr_complete': 0,         # avg_hr present
@@ -145,22 +314,362 @@ stats = {
     'error_details': []  # List of dicts with full context
 }
 
+# Les compteurs sont incrémentés depuis plusieurs threads (import wellness,
+# activités en parallèle): toujours passer par bump_stat()
+STATS_LOCK = threading.Lock()
+
+def bump_stat(key: str, amount: int = 1):
+    """Incrémenter un compteur de stats de façon thread-safe"""
+    with STATS_LOCK:
+        stats[key] += amount
+
+# Préfixe/suffixe couleur par niveau (calculés une fois, après l'éventuel
+# retrait des codes ANSI)
+LOG_COLORS = {
+    "ERROR": (Colors.RED, Colors.END),
+    "SUCCESS": (Colors.GREEN, Colors.END),
+    "WARNING": (Colors.YELLOW, Colors.END),
+}
+
+def _reset_stats():
+    """Remettre les compteurs à zéro (processus worker, un athlète à la fois)"""
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            for sub_key in value:
+                value[sub_key] = 0
+        elif isinstance(value, list):
+            value.clear()
+        else:
+            stats[key] = 0
+
+
+def _merge_stats(other: dict):
+    """Additionner les compteurs d'un worker dans les statistiques globales"""
+    with STATS_LOCK:
+        for key, value in other.items():
+            if isinstance(value, dict):
+                for sub_key, sub_value in value.items():
+                    stats[key][sub_key] = stats[key].get(sub_key, 0) + sub_value
+            elif isinstance(value, list):
+                stats[key].extend(value)
+            else:
+                stats[key] += value
+
+# Les lignes de log passent par une file: un seul thread écrit sur stdout,
+# par paquets (un write par paquet), au lieu que chaque thread d'activité
+# prenne le verrou de stdout ligne par ligne
+LOG_WRITE_BATCH = 256
+
+_log_queue = queue.Queue()
+_log_writer = None
+_log_writer_lock = threading.Lock()
+
+# Activité en cours dans ce thread, posée par process_athlete seulement avec
+# --activity-workers > 1: les lignes entrelacées portent leur activity_id
+_log_context = threading.local()
+
+def _log_writer_loop():
+    """Écrire les lignes en file sur stdout, par paquets"""
+    while True:
+        lines = [_log_queue.get()]
+        try:
+            while len(lines) < LOG_WRITE_BATCH:
+                lines.append(_log_queue.get_nowait())
+        except queue.Empty:
+            pass
+        try:
+            sys.stdout.write("\n".join(lines) + "\n")
+            sys.stdout.flush()
+        except Exception:
+            pass  # stdout fermé: les lignes sont perdues, pas le run
+        for _ in lines:
+            _log_queue.task_done()
+
+def flush_log():
+    """Attendre que toutes les lignes en file soient écrites (avant un print())"""
+    if _log_writer is not None:
+        _log_queue.join()
+
+atexit.register(flush_log)
+
 def log(msg: str, level: str = "INFO"):
     """Logger avec couleurs"""
-    timestamp = datetime.now().strftime("%H:%M:%S")
-    if level == "ERROR":
-        print(f"{Colors.RED}[{timestamp}] {msg}{Colors.END}")
-    elif level == "SUCCESS":
-        print(f"{Colors.GREEN}[{timestamp}] {msg}{Colors.END}")
-    elif level == "WARNING":
-        print(f"{Colors.YELLOW}[{timestamp}] {msg}{Colors.END}")
-    else:
-        print(f"[{timestamp}] {msg}")
+    global _log_writer
+    if QUIET and level in ("INFO", "SUCCESS"):
+        return
+    start, end = LOG_COLORS.get(level, ("", ""))
+    if _log_writer is None:
+        with _log_writer_lock:
+            if _log_writer is None:
+                _log_writer = threading.Thread(target=_log_writer_loop, name="log-writer", daemon=True)
+                _log_writer.start()
+    activity_id = getattr(_log_context, 'activity_id', None)
+    if activity_id is not None:
+        body = msg.lstrip("\n")
+        msg = f"{msg[:len(msg) - len(body)]}[{activity_id}] {body}"
+    _log_queue.put(f"{start}[{time.strftime('%H:%M:%S')}] {msg}{end}")
 
 # Weather API Functions
 
+OM_FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+OM_ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
+OM_AIR_QUALITY_URL = "https://air-quality-api.open-meteo.com/v1/air-quality"
+
+# Hourly weather variables requested from Open-Meteo (forecast + archive)
+WEATHER_KEYS = (
+    "temperature_2m", "relative_humidity_2m", "dew_point_2m",
+    "wind_speed_10m", "wind_gusts_10m", "wind_direction_10m",
+    "pressure_msl", "cloudcover", "precipitation",
+)
+
+# Hourly air quality variables
+AIR_KEYS = (
+    "pm2_5", "pm10", "ozone", "nitrogen_dioxide",
+    "sulphur_dioxide", "carbon_monoxide", "us_aqi",
+)
+
+# Variable Open-Meteo → colonne activity_metadata (+ conversion éventuelle)
+WEATHER_FIELD_MAP = (
+    ("temperature_2m", "weather_temp_c", None),
+    ("relative_humidity_2m", "weather_humidity_pct", int),
+    ("dew_point_2m", "weather_dew_point_c", None),
+    ("wind_speed_10m", "weather_wind_speed_ms", None),
+    ("wind_gusts_10m", "weather_wind_gust_ms", None),
+    ("wind_direction_10m", "weather_wind_dir_deg", int),
+    ("pressure_msl", "weather_pressure_hpa", None),
+    ("cloudcover", "weather_cloudcover_pct", int),
+    ("precipitation", "weather_precip_mm", None),
+)
+
+AIR_FIELD_MAP = (
+    ("pm2_5", "air_pm2_5", None),
+    ("pm10", "air_pm10", None),
+    ("ozone", "air_ozone", None),
+    ("nitrogen_dioxide", "air_no2", None),
+    ("sulphur_dioxide", "air_so2", None),
+    ("carbon_monoxide", "air_co", None),
+    ("us_aqi", "air_us_aqi", int),
+)
+
+def apply_fields(dst: Dict, src: Dict, field_map) -> None:
+    """Copier les valeurs non nulles de src dans dst selon field_map"""
+    for src_key, dst_key, cast in field_map:
+        value = src.get(src_key)
+        if value is not None:
+            dst[dst_key] = cast(value) if cast else value
+
+# Query parameters shared by every call; each request only adds its
+# location and date window on top of these
+WEATHER_PARAMS_BASE = {
+    "hourly": ",".join(WEATHER_KEYS),
+    "timezone": "auto",
+    "timeformat": "iso8601",
+    "temperature_unit": "celsius",
+    "windspeed_unit": "ms",
+}
+AIR_PARAMS_BASE = {
+    "hourly": ",".join(AIR_KEYS),
+    "timezone": "auto",
+    "timeformat": "iso8601",
+}
+
+# Optional on-disk cache for Open-Meteo archive payloads (opt-in via env).
+# Archive data for a past window does not change, so reruns and bulk imports
+# across athletes reuse it instead of hitting the network again.
+WEATHER_CACHE_PATH = os.environ.get("WEATHER_CACHE_PATH")
+WEATHER_CACHE_TTL_SEC = 30 * 24 * 3600
+WEATHER_CACHE_MIN_AGE_DAYS = 7  # Recent archive data may still be revised
+
+# Emplacement du cache disque avec --weather-cache (si WEATHER_CACHE_PATH absent)
+WEATHER_CACHE_DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "ins_dashboard", "weather.sqlite")
+
+_weather_cache_conn = None
+_weather_cache_lock = threading.Lock()
+
+def _weather_cache() -> sqlite3.Connection:
+    """Open the cache database once per process (caller holds the lock)"""
+    global _weather_cache_conn
+    if _weather_cache_conn is None:
+        conn = sqlite3.connect(WEATHER_CACHE_PATH, timeout=30, check_same_thread=False)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS payloads "
+            "(key TEXT PRIMARY KEY, fetched_at REAL NOT NULL, payload BLOB NOT NULL)"
+        )
+        # Valeurs déjà résolues par (source, lat/lon arrondis, heure), voir _weather_memo_put
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS hourly "
+            "(key TEXT PRIMARY KEY, expires_at REAL NOT NULL, payload BLOB NOT NULL)"
+        )
+        _weather_cache_conn = conn
+    return _weather_cache_conn
+
+def fetch_open_meteo_archive(url: str, params: dict, timeout: float) -> dict:
+    """
+    GET an Open-Meteo payload for a dated window, through the disk cache.
+
+    The cache is only used when WEATHER_CACHE_PATH is set and the window
+    ended at least WEATHER_CACHE_MIN_AGE_DAYS ago. Errors propagate exactly
+    like HTTP_SESSION.get + raise_for_status, so callers keep their handling;
+    SQLite errors only turn into a cache miss or a skipped write.
+    """
+    cacheable = bool(WEATHER_CACHE_PATH) and (
+        date.fromisoformat(params["end_date"])
+        <= date.today() - timedelta(days=WEATHER_CACHE_MIN_AGE_DAYS)
+    )
+    if cacheable:
+        key = "|".join([
+            url, f"{params['latitude']:.3f}", f"{params['longitude']:.3f}",
+            params["start_date"], params["end_date"], params["hourly"]
+        ])
+        try:
+            with _weather_cache_lock:
+                row = _weather_cache().execute(
+                    "SELECT fetched_at, payload FROM payloads WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            # Cache verrouillé, corrompu ou introuvable: simple miss
+            log(f"Cache météo disque illisible: {e}", "WARNING")
+            row = None
+        if row and time.time() - row[0] < WEATHER_CACHE_TTL_SEC:
+            return orjson.loads(row[1])
+
+    response = HTTP_SESSION.get(url, params=params, timeout=timeout)
+    response.raise_for_status()
+    payload = orjson.loads(response.content)
+
+    if cacheable and payload.get("hourly"):
+        try:
+            with _weather_cache_lock:
+                conn = _weather_cache()
+                conn.execute(
+                    "INSERT OR REPLACE INTO payloads (key, fetched_at, payload) VALUES (?, ?, ?)",
+                    (key, time.time(), response.content)
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            # Écriture ignorée: le payload téléchargé reste valable
+            log(f"Cache météo disque non écrit: {e}", "WARNING")
+    return payload
+
+@functools.lru_cache(maxsize=4096)
+def parse_iso_timestamp(value: str) -> datetime:
+    """
+    Parse an ISO-8601 timestamp ('Z' or offset suffix) once per distinct string.
+
+    The same activity start_time is parsed by the archive, air quality and
+    nearest-hour lookups; the cache turns the repeats into dict hits.
+    """
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+# Cache mémoire des résultats par (endpoint, lat/lon arrondis à 0.01° ≈ 1 km,
+# heure la plus proche): activités co-localisées à la même heure (équipe,
+# plusieurs athlètes au même endroit) ne refont pas les mêmes requêtes.
+# LRU + TTL par source: l'archive ne bouge plus, la prévision oui.
+WEATHER_MEMO_MAXSIZE = 4096
+WEATHER_MEMO_TTL_SEC = {'archive': 24 * 3600, 'forecast': 15 * 60, 'air': 24 * 3600,
+                        'archive_miss': 15 * 60}
+# Sur disque (WEATHER_CACHE_PATH): archive figée 30 jours, prévision 1 h
+WEATHER_FORECAST_DISK_TTL_SEC = 3600
+
+_weather_memo = OrderedDict()
+_weather_memo_lock = threading.Lock()
+
+def _weather_memo_key(endpoint: str, lat: float, lng: float, start_time: str) -> Optional[tuple]:
+    """Clé du cache mémoire (None si la position ou l'heure est inexploitable)"""
+    try:
+        ts = parse_iso_timestamp(start_time)
+        # Heure la plus proche, la plus tôt en cas d'égalité (comme _nearest_from_hourly)
+        hour = (ts + timedelta(minutes=30, microseconds=-1)).replace(minute=0, second=0, microsecond=0)
+        return (endpoint, round(float(lat), 2), round(float(lng), 2), hour.isoformat())
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+def _weather_memo_disk_get(key: tuple):
+    """Entrée du cache disque (table hourly) non expirée, sinon None"""
+    try:
+        with _weather_cache_lock:
+            row = _weather_cache().execute(
+                "SELECT expires_at, payload FROM hourly WHERE key = ?", ("|".join(map(str, key)),)
+            ).fetchone()
+    except sqlite3.Error as e:
+        # Cache verrouillé ou corrompu: simple miss, ne jamais bloquer l'import
+        log(f"Cache météo disque illisible: {e}", "WARNING")
+        return None
+    if not row or row[0] < time.time():
+        return None
+    value = orjson.loads(row[1])
+    # (weather, source, error) est sérialisé en liste JSON
+    return tuple(value) if isinstance(value, list) else value
+
+def _weather_memo_get(key: Optional[tuple]):
+    """Valeur en cache non expirée (mémoire, puis disque si activé), sinon None"""
+    if key is None:
+        return None
+    with _weather_memo_lock:
+        entry = _weather_memo.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at >= time.monotonic():
+                _weather_memo.move_to_end(key)
+                return value
+            del _weather_memo[key]
+    if not WEATHER_CACHE_PATH:
+        return None
+    value = _weather_memo_disk_get(key)
+    if value is not None:
+        source = value[1] if isinstance(value, tuple) else key[0]  # 'archive', 'forecast' ou 'air'
+        _weather_memo_put(key, value, WEATHER_MEMO_TTL_SEC[source])
+    return value
+
+def _weather_memo_put(key: Optional[tuple], value, ttl: float, disk_ttl: Optional[float] = None):
+    """
+    Mémoriser une valeur (éviction LRU au-delà de WEATHER_MEMO_MAXSIZE).
+
+    Avec disk_ttl et WEATHER_CACHE_PATH, la valeur est aussi écrite dans la
+    table hourly du cache disque pour les exécutions suivantes.
+    """
+    if key is None:
+        return
+    with _weather_memo_lock:
+        _weather_memo[key] = (time.monotonic() + ttl, value)
+        _weather_memo.move_to_end(key)
+        while len(_weather_memo) > WEATHER_MEMO_MAXSIZE:
+            _weather_memo.popitem(last=False)
+    if disk_ttl and WEATHER_CACHE_PATH:
+        try:
+            with _weather_cache_lock:
+                conn = _weather_cache()
+                conn.execute(
+                    "INSERT OR REPLACE INTO hourly (key, expires_at, payload) VALUES (?, ?, ?)",
+                    ("|".join(map(str, key)), time.time() + disk_ttl, orjson.dumps(value))
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            # Écriture ignorée: la valeur reste en mémoire pour cette exécution
+            log(f"Cache météo disque non écrit: {e}", "WARNING")
+
+def _archive_disk_ttl(start_time: str) -> Optional[float]:
+    """TTL disque d'une valeur d'archive: seulement une fois l'archive figée"""
+    try:
+        day = parse_iso_timestamp(start_time).date()
+    except (TypeError, ValueError, AttributeError):
+        return None
+    if day <= date.today() - timedelta(days=WEATHER_CACHE_MIN_AGE_DAYS):
+        return WEATHER_CACHE_TTL_SEC
+    return None
+
+@functools.lru_cache(maxsize=256)
+def _parse_hourly_times(times: Tuple[str, ...]) -> List[datetime]:
+    """
+    Parse an Open-Meteo hourly time grid once.
+
+    Weather archive, air quality and forecast responses for the same place
+    and day share the same grid, so later lookups reuse the parsed list.
+    """
+    return [datetime.fromisoformat(t.replace('Z', '+00:00')) for t in times]
+
 def _nearest_from_hourly(payload: dict, target_iso: str, keys: list) -> dict:
-    """Select nearest hourly value to target timestamp"""
+    """Select nearest hourly value to target timestamp (hourly times are sorted)"""
     out = {k: None for k in keys}
     hourly = (payload or {}).get("hourly", {})
     times = hourly.get("time", [])
@@ -168,12 +677,14 @@ def _nearest_from_hourly(payload: dict, target_iso: str, keys: list) -> dict:
         return out
     
     try:
-        from datetime import datetime as dt
-        ts = [dt.fromisoformat(t.replace('Z', '+00:00')) for t in times]
-        tgt = dt.fromisoformat(target_iso.replace('Z', '+00:00'))
-
-        diffs = [abs((t - tgt).total_seconds()) for t in ts]
-        idx = diffs.index(min(diffs))
+        ts = _parse_hourly_times(tuple(times))
+        tgt = parse_iso_timestamp(target_iso)
+
+        # Binary search, then keep the closer neighbour (the earlier one on ties)
+        idx = bisect.bisect_left(ts, tgt)
+        if idx == len(ts) or (idx > 0 and tgt - ts[idx - 1] <= ts[idx] - tgt):
+            idx -= 1
+        idx = bisect.bisect_left(ts, ts[idx])  # First of any repeated hour (DST)
         
         for k in keys:
             arr = hourly.get(k)
@@ -187,164 +698,67 @@ def _nearest_from_hourly(payload: dict, target_iso: str, keys: list) -> dict:
     
     return out
 
-def fetch_weather_data(lat: float, lng: float, start_time: str) -> dict:
-    """Fetch weather data from Open-Meteo"""
-    if not lat or not lng or not start_time:
-        return {}
-    
-    weather_keys = [
-        "temperature_2m", "relative_humidity_2m", "dew_point_2m",
-        "wind_speed_10m", "wind_gusts_10m", "wind_direction_10m",
-        "pressure_msl", "cloudcover", "precipitation",
-    ]
-    
-    params = {
-        "latitude": float(lat),
-        "longitude": float(lng),
-        "hourly": ",".join(weather_keys),
-        "past_days": 7,
-        "timezone": "auto",
-        "timeformat": "iso8601",
-        "temperature_unit": "celsius",
-        "windspeed_unit": "ms",
-    }
-    
-    try:
-        response = requests.get(
-            "https://api.open-meteo.com/v1/forecast",
-            params=params,
-            timeout=OM_TIMEOUT
-        )
-        response.raise_for_status()
-        return _nearest_from_hourly(response.json(), start_time, weather_keys)
-    except:
-        return {}
-
-def fetch_air_quality_data(lat: float, lng: float, start_time: str) -> dict:
-    """Fetch air quality data from Open-Meteo"""
-    if not lat or not lng or not start_time:
-        return {}
-    
-    air_keys = [
-        "pm2_5", "pm10", "ozone", "nitrogen_dioxide",
-        "sulphur_dioxide", "carbon_monoxide", "us_aqi"
-    ]
-    
-    params = {
-        "latitude": float(lat),
-        "longitude": float(lng),
-        "hourly": ",".join(air_keys),
-        "past_days": 7,
-        "timezone": "auto",
-        "timeformat": "iso8601",
-    }
-    
-    try:
-        response = requests.get(
-            "https://air-quality-api.open-meteo.com/v1/air-quality",
-            params=params,
-            timeout=AQ_TIMEOUT
-        )
-        response.raise_for_status()
-        return _nearest_from_hourly(response.json(), start_time, air_keys)
-    except:
-        return {}
-
-def fetch_weather_archive(lat: float, lng: float, start_time: str) -> dict:
-    """Fetch archived weather data from Open-Meteo (for older activities)"""
-    if not lat or not lng or not start_time:
-        return {}
-    
-    weather_keys = [
-        "temperature_2m", "relative_humidity_2m", "dew_point_2m",
-        "wind_speed_10m", "wind_gusts_10m", "wind_direction_10m",
-        "pressure_msl", "cloudcover", "precipitation",
-    ]
-    
-    try:
-        # Extract date from ISO timestamp
-        from datetime import datetime as dt
-        activity_date = dt.fromisoformat(start_time.replace('Z', '+00:00')).date()
-        
-        params = {
-            "latitude": float(lat),
-            "longitude": float(lng),
-            "hourly": ",".join(weather_keys),
-            "start_date": activity_date.isoformat(),
-            "end_date": activity_date.isoformat(),
-            "timezone": "auto",
-            "timeformat": "iso8601",
-            "temperature_unit": "celsius",
-            "windspeed_unit": "ms",
-        }
-        
-        response = requests.get(
-            "https://archive-api.open-meteo.com/v1/archive",
-            params=params,
-            timeout=OM_TIMEOUT
-        )
-        response.raise_for_status()
-        return _nearest_from_hourly(response.json(), start_time, weather_keys)
-    except:
-        return {}
-
 def fetch_air_quality_archive(lat: float, lng: float, start_time: str) -> dict:
     """Fetch archived air quality data from Open-Meteo (for older activities)"""
     if not lat or not lng or not start_time:
         return {}
     
-    air_keys = [
-        "pm2_5", "pm10", "ozone", "nitrogen_dioxide",
-        "sulphur_dioxide", "carbon_monoxide", "us_aqi"
-    ]
+    memo_key = _weather_memo_key('air', lat, lng, start_time)
+    cached = _weather_memo_get(memo_key)
+    if cached is not None:
+        return cached
     
     try:
-        from datetime import datetime as dt
-        activity_date = dt.fromisoformat(start_time.replace('Z', '+00:00')).date()
+        activity_date = parse_iso_timestamp(start_time).date()
         
         params = {
+            **AIR_PARAMS_BASE,
             "latitude": float(lat),
             "longitude": float(lng),
-            "hourly": ",".join(air_keys),
             "start_date": activity_date.isoformat(),
             "end_date": activity_date.isoformat(),
-            "timezone": "auto",
-            "timeformat": "iso8601",
         }
         
-        response = requests.get(
-            "https://air-quality-api.open-meteo.com/v1/air-quality",
-            params=params,
-            timeout=AQ_TIMEOUT
-        )
-        response.raise_for_status()
-        return _nearest_from_hourly(response.json(), start_time, air_keys)
+        payload = fetch_open_meteo_archive(OM_AIR_QUALITY_URL, params, AQ_TIMEOUT)
+        air = _nearest_from_hourly(payload, start_time, AIR_KEYS)
+        if any(value is not None for value in air.values()):
+            _weather_memo_put(memo_key, air, WEATHER_MEMO_TTL_SEC['air'], _archive_disk_ttl(start_time))
+        return air
     except:
         return {}
 
+@functools.lru_cache(maxsize=4096)
+def _elev_cached(lat_k: float, lng_k: float) -> float:
+    """Elevation of a rounded GPS cell (errors raise, so they are not cached)"""
+    response = HTTP_SESSION.get(
+        "https://api.open-elevation.com/api/v1/lookup",
+        params={"locations": f"{lat_k},{lng_k}"},
+        timeout=ELEV_TIMEOUT
+    )
+    response.raise_for_status()
+    data = orjson.loads(response.content)
+    return float(data["results"][0]["elevation"])
+
 def fetch_elevation(lat: float, lng: float) -> Optional[float]:
-    """Fetch elevation from Open-Elevation API"""
+    """Fetch elevation from Open-Elevation API (cached per 0.001° ≈ 110 m cell)"""
     if not lat or not lng:
         return None
     
     try:
-        response = requests.get(
-            "https://api.open-elevation.com/api/v1/lookup",
-            params={"locations": f"{lat},{lng}"},
-            timeout=ELEV_TIMEOUT
-        )
-        response.raise_for_status()
-        data = response.json()
-        results = data.get("results", [])
-        if results:
-            return float(results[0].get("elevation"))
+        return _elev_cached(round(float(lat), 3), round(float(lng), 3))
     except:
-        pass
-    
-    return None
+        return None
 
 # PHASE 1: Weather Retry Cascade (Best Effort)
 
+# Random extra delay added to every retry sleep so that concurrent workers
+# hitting the same failing endpoint do not all retry in lockstep
+RETRY_JITTER_SEC = 0.25
+
+def _backoff_sleep(delay: float):
+    """Sleep for delay seconds plus a small random jitter"""
+    time.sleep(delay + random.random() * RETRY_JITTER_SEC)
+
 def fetch_weather_archive_with_retry(lat: float, lng: float, start_time: str) -> Tuple[dict, Optional[str]]:
     """
     Fetch weather archive with detailed error handling.
@@ -355,36 +769,20 @@ def fetch_weather_archive_with_retry(lat: float, lng: float, start_time: str) ->
     if not lat or not lng or not start_time:
         return {}, "Missing coordinates or time"
     
-    weather_keys = [
-        "temperature_2m", "relative_humidity_2m", "dew_point_2m",
-        "wind_speed_10m", "wind_gusts_10m", "wind_direction_10m",
-        "pressure_msl", "cloudcover", "precipitation",
-    ]
-    
     try:
         # Extract date from ISO timestamp
-        from datetime import datetime as dt
-        activity_date = dt.fromisoformat(start_time.replace('Z', '+00:00')).date()
+        activity_date = parse_iso_timestamp(start_time).date()
         
         params = {
+            **WEATHER_PARAMS_BASE,
             "latitude": float(lat),
             "longitude": float(lng),
-            "hourly": ",".join(weather_keys),
             "start_date": activity_date.isoformat(),
             "end_date": activity_date.isoformat(),
-            "timezone": "auto",
-            "timeformat": "iso8601",
-            "temperature_unit": "celsius",
-            "windspeed_unit": "ms",
         }
         
-        response = requests.get(
-            "https://archive-api.open-meteo.com/v1/archive",
-            params=params,
-            timeout=OM_TIMEOUT
-        )
-        response.raise_for_status()
-        data = _nearest_from_hourly(response.json(), start_time, weather_keys)
+        payload = fetch_open_meteo_archive(OM_ARCHIVE_URL, params, OM_TIMEOUT)
+        data = _nearest_from_hourly(payload, start_time, WEATHER_KEYS)
         
         # Validate we got at least temperature
         if data.get('temperature_2m') is None:
@@ -413,31 +811,21 @@ def fetch_weather_forecast_with_retry(lat: float, lng: float, start_time: str) -
     if not lat or not lng or not start_time:
         return {}, "Missing coordinates or time"
     
-    weather_keys = [
-        "temperature_2m", "relative_humidity_2m", "dew_point_2m",
-        "wind_speed_10m", "wind_gusts_10m", "wind_direction_10m",
-        "pressure_msl", "cloudcover", "precipitation",
-    ]
-    
     params = {
+        **WEATHER_PARAMS_BASE,
         "latitude": float(lat),
         "longitude": float(lng),
-        "hourly": ",".join(weather_keys),
         "past_days": 7,
-        "timezone": "auto",
-        "timeformat": "iso8601",
-        "temperature_unit": "celsius",
-        "windspeed_unit": "ms",
     }
     
     try:
-        response = requests.get(
-            "https://api.open-meteo.com/v1/forecast",
+        response = HTTP_SESSION.get(
+            OM_FORECAST_URL,
             params=params,
             timeout=OM_TIMEOUT
         )
         response.raise_for_status()
-        data = _nearest_from_hourly(response.json(), start_time, weather_keys)
+        data = _nearest_from_hourly(orjson.loads(response.content), start_time, WEATHER_KEYS)
         
         if data.get('temperature_2m') is None:
             return {}, "No temperature data in forecast response"
@@ -452,41 +840,274 @@ def fetch_weather_forecast_with_retry(lat: float, lng: float, start_time: str) -
         return {}, f"Forecast error: {type(e).__name__}"
 
 
+def _weather_error_retryable(error: Optional[str]) -> bool:
+    """
+    Faut-il refaire la même requête météo?
+
+    Comme retry_with_exponential_backoff: les 4xx (sauf 429) sont définitifs.
+    Une réponse 200 sans température ne changera pas non plus en 1-2 s.
+    """
+    if not error:
+        return True
+    if error.startswith(("HTTP 4", "Forecast HTTP 4")):
+        return error.endswith("429")
+    return not error.startswith(("No temperature data", "Missing coordinates"))
+
+
+def _archive_miss_key(start_time: str) -> Optional[tuple]:
+    """Clé du cache négatif: jour déjà refusé (4xx) par l'archive"""
+    try:
+        return ('archive_miss', parse_iso_timestamp(start_time).date().isoformat())
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+# Pool partagé pour la prévision lancée en parallèle des retries d'archive
+# (un pool par appel laissait tourner des cascades devenues inutiles)
+FORECAST_EXECUTOR = ThreadPoolExecutor(max_workers=WEATHER_WORKERS, thread_name_prefix="forecast")
+
+def _forecast_cascade(lat: float, lng: float, start_time: str,
+                      stop: Optional[threading.Event] = None) -> Tuple[dict, Optional[str]]:
+    """
+    Forecast (estimation, may not work for old dates) - up to 3 attempts.
+
+    stop est levé quand l'archive a répondu: la cascade s'arrête avant la
+    tentative suivante (ou pendant son backoff) au lieu de continuer à vide.
+    """
+    error = None
+    for attempt in range(3):
+        if stop is not None and stop.is_set():
+            return {}, "Cancelled (archive available)"
+        weather, error = fetch_weather_forecast_with_retry(lat, lng, start_time)
+        if weather and weather.get('temperature_2m') is not None:
+            return weather, None
+        if not _weather_error_retryable(error):
+            break
+        if attempt < 2:
+            delay = 2 ** attempt + random.random() * RETRY_JITTER_SEC
+            if stop is None:
+                time.sleep(delay)
+            elif stop.wait(delay):
+                return {}, "Cancelled (archive available)"
+    return {}, error
+
+
 def get_weather_best_effort(lat: float, lng: float, start_time: str) -> Tuple[dict, Optional[str], Optional[str]]:
     """
     Try all methods to get weather, but NEVER block import.
     
+    Archive stays the preferred source, but as soon as its first attempt
+    fails the forecast cascade starts in parallel with the archive retries:
+    total latency is max(archive, forecast) instead of their sum. When the
+    archive wins, the forecast is cancelled (or stops at its next step).
+    Definitive answers (4xx other than 429, no data) are not retried, and
+    an archive 4xx for a day is remembered so later activities of that day
+    go straight to the forecast.
+    
     Returns:
         (weather_data, source, error_message)
         - weather_data: dict with weather keys, or {} if all failed
         - source: 'archive', 'forecast', or None
         - error_message: None if success, error description if failed
     """
-    
-    # Strategy 1: Archive (real historical data) - 3 attempts
-    for attempt in range(3):
+    # Même endroit (≈ 1 km) et même heure déjà résolus: pas de requête
+    memo_key = _weather_memo_key('weather', lat, lng, start_time)
+    cached = _weather_memo_get(memo_key)
+    if cached is not None:
+        return cached
+    
+    miss_key = _archive_miss_key(start_time)
+    error = _weather_memo_get(miss_key)
+    forecast_stop = threading.Event()
+    forecast_future = None
+    
+    # Strategy 1: Archive (real historical data) - up to 3 attempts
+    for attempt in range(3 if error is None else 0):
         weather, error = fetch_weather_archive_with_retry(lat, lng, start_time)
         if weather and weather.get('temperature_2m') is not None:
-            return weather, 'archive', None
+            if forecast_future is not None:
+                forecast_stop.set()
+                forecast_future.cancel()
+            result = (weather, 'archive', None)
+            _weather_memo_put(memo_key, result, WEATHER_MEMO_TTL_SEC['archive'],
+                              _archive_disk_ttl(start_time))
+            return result
+        if forecast_future is None:
+            # Strategy 2 starts now, concurrently with the archive retries
+            forecast_future = FORECAST_EXECUTOR.submit(_forecast_cascade, lat, lng, start_time, forecast_stop)
+        if not _weather_error_retryable(error):
+            if error.startswith("HTTP 4"):
+                _weather_memo_put(miss_key, error, WEATHER_MEMO_TTL_SEC['archive_miss'])
+            break
         if attempt < 2:
-            time.sleep(2 ** attempt)  # Exponential backoff: 1s, 2s
+            _backoff_sleep(2 ** attempt)  # Exponential backoff: 1s, 2s
     
-    # Strategy 2: Forecast (estimation, may not work for old dates) - 3 attempts
-    for attempt in range(3):
-        weather, error = fetch_weather_forecast_with_retry(lat, lng, start_time)
-        if weather and weather.get('temperature_2m') is not None:
-            return weather, 'forecast', 'Archive unavailable, used forecast estimation'
-        if attempt < 2:
-            time.sleep(2 ** attempt)
+    if forecast_future is None:
+        weather, error = _forecast_cascade(lat, lng, start_time)  # Archive déjà refusée ce jour
+    else:
+        weather, error = forecast_future.result()
+    if weather:
+        result = (weather, 'forecast', 'Archive unavailable, used forecast estimation')
+        _weather_memo_put(memo_key, result, WEATHER_MEMO_TTL_SEC['forecast'],
+                          WEATHER_FORECAST_DISK_TTL_SEC)
+        return result
     
     # Strategy 3: Complete failure - return empty BUT DON'T BLOCK
-    final_error = f"All weather sources failed after 6 attempts. Last error: {error}"
+    final_error = f"All weather sources failed. Last error: {error}"
     return {}, None, final_error
 
 
+def fetch_weather_and_air_quality(lat: float, lng: float, start_time: str) -> Tuple[dict, Optional[str], Optional[str], dict]:
+    """
+    Fetch weather (archive → forecast cascade) and air quality concurrently.
+
+    Both are independent Open-Meteo calls, so the air quality request no
+    longer waits behind the weather cascade and its retries.
+
+    Returns:
+        (weather_data, source, error_message, air_quality_data)
+    """
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        weather_future = executor.submit(get_weather_best_effort, lat, lng, start_time)
+        air_future = executor.submit(fetch_air_quality_archive, lat, lng, start_time)
+        weather, weather_source, weather_error = weather_future.result()
+        return weather, weather_source, weather_error, air_future.result()
+
+
+# Météo groupée: les activités d'un athlète sont préparées par fenêtres de
+# WEATHER_BATCH_SIZE, puis UNE requête Open-Meteo multi-points (archive +
+# qualité de l'air) couvre toute la fenêtre au lieu de 2 requêtes par activité
+WEATHER_BATCH_SIZE = 20
+WEATHER_BATCH_MAX_DAYS = 14  # Dates couvertes par une requête (taille de la réponse)
+
+def fetch_open_meteo_points(url: str, base_params: dict, points: List[Tuple[str, float, float, str]],
+                            timeout: float) -> List[dict]:
+    """
+    One Open-Meteo request for several locations over a shared date window.
+
+    Args:
+        points: (activity_id, lat, lng, start_time) tuples
+
+    Returns:
+        One hourly payload per point, in the same order
+    """
+    days = [parse_iso_timestamp(start_time).date() for _, _, _, start_time in points]
+    params = {
+        **base_params,
+        "latitude": ",".join(str(float(lat)) for _, lat, _, _ in points),
+        "longitude": ",".join(str(float(lng)) for _, _, lng, _ in points),
+        "start_date": min(days).isoformat(),
+        "end_date": max(days).isoformat(),
+    }
+    response = HTTP_SESSION.get(url, params=params, timeout=timeout)
+    response.raise_for_status()
+    payload = orjson.loads(response.content)
+    # Un seul point: Open-Meteo renvoie un objet au lieu d'une liste
+    return payload if isinstance(payload, list) else [payload]
+
+def prefetch_weather(points: List[Tuple[str, float, float, str]]) -> Dict[str, Tuple[Optional[tuple], Optional[dict]]]:
+    """
+    Fetch archive weather + air quality for many activities in grouped requests.
+
+    Points are sorted by date and split into groups spanning at most
+    WEATHER_BATCH_MAX_DAYS; each group costs one archive and one air quality
+    request (sent concurrently).
+
+    Returns:
+        {activity_id: (weather_result, air)} where weather_result is
+        (weather, 'archive', None) when the archive has data for that hour
+        and None otherwise, and air is None if the air quality request
+        failed. Callers fall back to the per-activity cascade on None.
+    """
+    results = {}
+    dated = []
+    for point in points:
+        activity_id, lat, lng, start_time = point
+        weather_result = _weather_memo_get(_weather_memo_key('weather', lat, lng, start_time))
+        air = _weather_memo_get(_weather_memo_key('air', lat, lng, start_time))
+        if weather_result is not None and air is not None:
+            results[activity_id] = (weather_result, air)  # Déjà en cache mémoire
+            continue
+        try:
+            dated.append((parse_iso_timestamp(start_time).date(), point))
+        except (TypeError, ValueError):
+            continue  # Pas de date exploitable: chemin par activité
+    dated.sort(key=lambda item: item[0])
+
+    groups = []
+    for day, point in dated:
+        if groups and (day - groups[-1][0]).days < WEATHER_BATCH_MAX_DAYS:
+            groups[-1][1].append(point)
+        else:
+            groups.append((day, [point]))
+
+    def _fetch(url, base_params, group, timeout):
+        try:
+            return fetch_open_meteo_points(url, base_params, group, timeout)
+        except Exception as e:
+            log(f"  Météo groupée indisponible ({type(e).__name__}), fallback par activité", "WARNING")
+            return None
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        for _, group in groups:
+            weather_future = executor.submit(_fetch, OM_ARCHIVE_URL, WEATHER_PARAMS_BASE, group, OM_TIMEOUT)
+            air_future = executor.submit(_fetch, OM_AIR_QUALITY_URL, AIR_PARAMS_BASE, group, AQ_TIMEOUT)
+            weather_payloads, air_payloads = weather_future.result(), air_future.result()
+
+            for idx, (activity_id, lat, lng, start_time) in enumerate(group):
+                weather_result = None
+                if weather_payloads and idx < len(weather_payloads):
+                    weather = _nearest_from_hourly(weather_payloads[idx], start_time, WEATHER_KEYS)
+                    if weather.get('temperature_2m') is not None:
+                        weather_result = (weather, 'archive', None)
+                        _weather_memo_put(_weather_memo_key('weather', lat, lng, start_time),
+                                          weather_result, WEATHER_MEMO_TTL_SEC['archive'],
+                                          _archive_disk_ttl(start_time))
+                air = None
+                if air_payloads and idx < len(air_payloads):
+                    air = _nearest_from_hourly(air_payloads[idx], start_time, AIR_KEYS)
+                    if any(value is not None for value in air.values()):
+                        _weather_memo_put(_weather_memo_key('air', lat, lng, start_time),
+                                          air, WEATHER_MEMO_TTL_SEC['air'], _archive_disk_ttl(start_time))
+                results[activity_id] = (weather_result, air)
+
+    return results
+
+
+def fetch_weather_archive_range(lat: float, lng: float, start_date: date, end_date: date) -> Tuple[dict, Optional[str]]:
+    """
+    Fetch the raw hourly archive payload for one location over a date range.
+
+    One request covers every activity recorded near (lat, lng) between
+    start_date and end_date; callers resolve each activity's hour locally
+    with _nearest_from_hourly.
+
+    Returns:
+        (payload, error_message)
+    """
+    params = {
+        **WEATHER_PARAMS_BASE,
+        "latitude": float(lat),
+        "longitude": float(lng),
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+    }
+
+    try:
+        payload = fetch_open_meteo_archive(OM_ARCHIVE_URL, params, OM_TIMEOUT)
+        return payload, None
+    except requests.exceptions.Timeout:
+        return {}, "Timeout"
+    except requests.exceptions.HTTPError as e:
+        return {}, f"HTTP {e.response.status_code}"
+    except Exception as e:
+        return {}, f"{type(e).__name__}: {str(e)}"
+
+
 # WEATHER BACKFILL SYSTEM
 
-def supa_select(table: str, select: str = "*", params: dict = None) -> pd.DataFrame:
+def supa_select(table: str, select: str = "*", params: dict = None,
+                as_records: bool = False) -> Union[pd.DataFrame, List[Dict]]:
     """
     Query Supabase table and return results as DataFrame.
 
@@ -494,9 +1115,11 @@ def supa_select(table: str, select: str = "*", params: dict = None) -> pd.DataFr
         table: Table name
         select: Columns to select (default: all)
         params: Query parameters (e.g., {"date": "gte.2024-11-01"})
+        as_records: Return the raw list of row dicts instead of a DataFrame
+            (for callers that only iterate over the rows)
 
     Returns:
-        DataFrame with query results
+        DataFrame with query results (list of dicts if as_records)
     """
     url = f"{SUPABASE_URL}/rest/v1/{table}?select={select}"
 
@@ -505,19 +1128,15 @@ def supa_select(table: str, select: str = "*", params: dict = None) -> pd.DataFr
         for key, value in params.items():
             url += f"&{key}={value}"
 
-    headers = {
-        "apikey": SUPABASE_KEY,
-        "Authorization": f"Bearer {SUPABASE_KEY}",
-    }
 
     try:
-        response = requests.get(url, headers=headers, timeout=30)
+        response = SUPABASE_REST_SESSION.get(url, timeout=30)
         response.raise_for_status()
-        data = response.json()
-        return pd.DataFrame(data)
+        data = orjson.loads(response.content)
+        return data if as_records else pd.DataFrame(data)
     except Exception as e:
         log(f"Query error: {e}", "ERROR")
-        return pd.DataFrame()
+        return [] if as_records else pd.DataFrame()
 
 
 def backfill_forecast_weather(days_back_min: int = 3, days_back_max: int = 7, dry_run: bool = False):
@@ -536,10 +1155,8 @@ def backfill_forecast_weather(days_back_min: int = 3, days_back_max: int = 7, dr
         days_back_max: Stop checking after this many days back (default: 7)
         dry_run: If True, only report what would be updated
     """
-    from datetime import datetime as dt, timedelta
-
     # Calculate date range
-    today = dt.now().date()
+    today = datetime.now().date()
     oldest_date = today - timedelta(days=days_back_max)
     newest_date = today - timedelta(days=days_back_min)
 
@@ -553,13 +1170,17 @@ def backfill_forecast_weather(days_back_min: int = 3, days_back_max: int = 7, dr
         "weather_source": "eq.forecast"
     }
 
+    # Current weather columns too: archive only replaces the forecast when
+    # it is at least as complete
     activities_to_update = supa_select(
         "activity_metadata",
-        select="activity_id,athlete_id,date,start_lat,start_lon,start_time,weather_source",
-        params=params
+        select="activity_id,athlete_id,type,date,start_lat,start_lon,start_time,weather_source,"
+               + ",".join(column for _, column, _ in WEATHER_FIELD_MAP),
+        params=params,
+        as_records=True
     )
 
-    if activities_to_update.empty:
+    if not activities_to_update:
         log("  No activities with forecast weather found in window")
         return
 
@@ -567,74 +1188,90 @@ def backfill_forecast_weather(days_back_min: int = 3, days_back_max: int = 7, dr
 
     updated_count = 0
     still_forecast = 0
+    skipped_count = 0
+    pending_updates = []
+
+    to_check = []
     no_coords = 0
+    for activity in activities_to_update:
+        # Skip if no GPS coordinates (or no start time to match an hour)
+        if activity.get('start_lat') is None or activity.get('start_lon') is None or not activity.get('start_time'):
+            log(f"  {activity['activity_id']} ({activity['date']}): No GPS coordinates")
+            no_coords += 1
+            continue
+        to_check.append(activity)
+
+    # Group activities by location (~1 km) so each cluster needs ONE archive
+    # request spanning all of its dates instead of one request per activity
+    clusters = {}
+    for activity in to_check:
+        key = (round(float(activity['start_lat']), 2), round(float(activity['start_lon']), 2))
+        activity_day = parse_iso_timestamp(activity['start_time']).date()
+        clusters.setdefault(key, []).append((activity, activity_day))
+
+    log(f"  {len(to_check)} activities in {len(clusters)} location cluster(s)")
+
+    def _resolve_cluster(item):
+        (lat, lng), members = item
+        days = [day for _, day in members]
+        payload, error = fetch_weather_archive_range(lat, lng, min(days), max(days))
+        results = []
+        for activity, _ in members:
+            if error:
+                # Bulk request failed: fall back to the per-activity cascade
+                results.append(get_weather_best_effort(
+                    activity['start_lat'], activity['start_lon'], activity['start_time']
+                ))
+                continue
+            weather = _nearest_from_hourly(payload, activity['start_time'], WEATHER_KEYS)
+            if weather.get('temperature_2m') is not None:
+                results.append((weather, 'archive', None))
+            else:
+                # Archive responded but has no data for this hour yet
+                results.append(({}, 'forecast', 'Archive not available yet'))
+        return [activity for activity, _ in members], results
 
-    for _, activity in activities_to_update.iterrows():
+    # Try to fetch archive weather (should be available now), clusters concurrently
+    with ThreadPoolExecutor(max_workers=WEATHER_WORKERS) as executor:
+        resolved = list(executor.map(_resolve_cluster, clusters.items()))
+
+    to_check = [activity for members, _ in resolved for activity in members]
+    results = [result for _, cluster_results in resolved for result in cluster_results]
+
+    for activity, (weather, weather_source, weather_error) in zip(to_check, results):
         activity_id = activity['activity_id']
         activity_date = activity['date']
 
-        # Skip if no GPS coordinates
-        if pd.isna(activity['start_lat']) or pd.isna(activity['start_lon']):
-            log(f"  {activity_id} ({activity_date}): No GPS coordinates")
-            no_coords += 1
-            continue
-
         log(f"  Checking {activity_id} ({activity_date})...")
 
-        # Try to fetch archive weather (should be available now)
-        weather, weather_source, weather_error = get_weather_best_effort(
-            activity['start_lat'],
-            activity['start_lon'],
-            activity['start_time']
-        )
-
         # Check if we got archive data
         if weather_source == 'archive' and weather:
+            # Conditional replacement: skip the write when the archive has
+            # fewer non-null weather fields than the stored forecast
+            stored_fields = sum(activity.get(column) is not None for _, column, _ in WEATHER_FIELD_MAP)
+            archive_fields = sum(weather.get(key) is not None for key, _, _ in WEATHER_FIELD_MAP)
+            if archive_fields < stored_fields:
+                log(f"    ↷ Archive less complete than forecast ({archive_fields}/{stored_fields} fields), kept")
+                skipped_count += 1
+                continue
+
             log(f"    ✅ Archive weather now available!", "SUCCESS")
 
             if not dry_run:
-                # Build update data with all weather fields
+                # Build update row with all weather fields (NOT NULL columns
+                # are carried so the row is a valid upsert payload)
                 update_data = {
+                    'activity_id': activity_id,
+                    'athlete_id': activity['athlete_id'],
+                    'type': activity['type'],
+                    'date': activity_date,
                     'weather_source': 'archive'
                 }
 
                 # Add weather fields if available
-                if weather.get('temperature_2m') is not None:
-                    update_data['weather_temp_c'] = weather['temperature_2m']
-                if weather.get('relative_humidity_2m') is not None:
-                    update_data['weather_humidity_pct'] = int(weather['relative_humidity_2m'])
-                if weather.get('dew_point_2m') is not None:
-                    update_data['weather_dew_point_c'] = weather['dew_point_2m']
-                if weather.get('wind_speed_10m') is not None:
-                    update_data['weather_wind_speed_ms'] = weather['wind_speed_10m']
-                if weather.get('wind_gusts_10m') is not None:
-                    update_data['weather_wind_gust_ms'] = weather['wind_gusts_10m']
-                if weather.get('wind_direction_10m') is not None:
-                    update_data['weather_wind_dir_deg'] = int(weather['wind_direction_10m'])
-                if weather.get('pressure_msl') is not None:
-                    update_data['weather_pressure_hpa'] = weather['pressure_msl']
-                if weather.get('cloudcover') is not None:
-                    update_data['weather_cloudcover_pct'] = int(weather['cloudcover'])
-                if weather.get('precipitation') is not None:
-                    update_data['weather_precip_mm'] = weather['precipitation']
-
-                # Use PATCH to update existing record
-                update_url = f"{SUPABASE_URL}/rest/v1/activity_metadata?activity_id=eq.{activity_id}"
-                headers = {
-                    "apikey": SUPABASE_KEY,
-                    "Authorization": f"Bearer {SUPABASE_KEY}",
-                    "Content-Type": "application/json"
-                }
+                apply_fields(update_data, weather, WEATHER_FIELD_MAP)
 
-                try:
-                    response = requests.patch(update_url, headers=headers, json=update_data, timeout=30)
-                    if response.status_code == 200:
-                        log(f"    Updated forecast → archive", "SUCCESS")
-                        updated_count += 1
-                    else:
-                        log(f"    Update failed: {response.status_code}", "ERROR")
-                except Exception as e:
-                    log(f"    Update error: {e}", "ERROR")
+                pending_updates.append(update_data)
             else:
                 log(f"    [DRY-RUN] Would update to archive")
                 updated_count += 1
@@ -645,10 +1282,44 @@ def backfill_forecast_weather(days_back_min: int = 3, days_back_max: int = 7, dr
         else:
             log(f"    ⚠️  No weather available: {weather_error}", "WARNING")
 
+    # Write all updates as bulk upserts on activity_id instead of one PATCH
+    # per activity. Rows are grouped by key set so that fields missing from
+    # the archive keep their current value (PostgREST needs uniform keys).
+    if pending_updates:
+        update_url = f"{SUPABASE_URL}/rest/v1/activity_metadata?on_conflict=activity_id"
+        headers = {
+            "Content-Type": "application/json",
+            "Prefer": "resolution=merge-duplicates,return=minimal"
+        }
+
+        groups = {}
+        for update_data in pending_updates:
+            groups.setdefault(tuple(sorted(update_data)), []).append(update_data)
+
+        for rows in groups.values():
+            for i in range(0, len(rows), BATCH_SIZE):
+                batch = rows[i:i + BATCH_SIZE]
+                try:
+                    response = SUPABASE_REST_SESSION.post(
+                        update_url,
+                        headers=headers,
+                        data=orjson.dumps(batch, option=orjson.OPT_SERIALIZE_NUMPY),
+                        timeout=30
+                    )
+                    if response.status_code in (200, 201, 204):
+                        log(f"    Updated forecast → archive: {len(batch)} activities", "SUCCESS")
+                        updated_count += len(batch)
+                    else:
+                        log(f"    Update failed: {response.status_code}", "ERROR")
+                except Exception as e:
+                    log(f"    Update error: {e}", "ERROR")
+
     log(f"\n{Colors.BOLD}Backfill Summary:{Colors.END}")
     log(f"  Updated forecast → archive: {updated_count}")
     log(f"  Still using forecast: {still_forecast}")
+    log(f"  Kept forecast (archive less complete): {skipped_count}")
     log(f"  No coordinates: {no_coords}")
+    bump_stat('weather_backfill_skipped', skipped_count)
     log("")
 
 
@@ -669,24 +1340,25 @@ def get_avg_hr_with_fallback(activity_metadata: dict, streams_data: dict, record
     
     # Priority 1: Activity metadata
     if activity_metadata.get('avg_hr'):
-        stats['hr_complete'] += 1
+        bump_stat('hr_complete')
         return int(activity_metadata['avg_hr'])
     
     # Priority 2: Streams data
     if streams_data.get('avg_hr'):
-        stats['hr_complete'] += 1
+        bump_stat('hr_complete')
         return int(streams_data['avg_hr'])
     
     # Priority 3: Calculate from records
-    hr_values = [rec.get('heartrate') for rec in records if rec.get('heartrate') is not None]
-    if hr_values:
-        calculated_avg = sum(hr_values) / len(hr_values)
-        log(f"  ℹ️  avg_hr calculated from {len(hr_values)} records: {int(calculated_avg)} bpm")
-        stats['hr_complete'] += 1
+    hr_values = records_to_columns(records, ['heartrate'])['heartrate']
+    hr_values = hr_values[~np.isnan(hr_values)]
+    if hr_values.size:
+        calculated_avg = float(hr_values.mean())
+        log(f"  ℹ️  avg_hr calculated from {hr_values.size} records: {int(calculated_avg)} bpm")
+        bump_stat('hr_complete')
         return int(round(calculated_avg))
     
     # No HR data available anywhere
-    stats['hr_missing'] += 1
+    bump_stat('hr_missing')
     return None
 
 
@@ -723,10 +1395,10 @@ def retry_with_exponential_backoff(
             result = func(*args, **kwargs)
             return result, None  # Success
             
-        except requests.exceptions.Timeout as e:
+        except requests.exceptions.Timeout:
             last_error = f"Timeout (attempt {attempt + 1}/{max_retries})"
             if attempt < max_retries - 1:
-                time.sleep(delay)
+                _backoff_sleep(delay)
                 delay *= backoff_factor
                 
         except requests.exceptions.HTTPError as e:
@@ -734,16 +1406,23 @@ def retry_with_exponential_backoff(
             if status == 429:  # Rate limit
                 last_error = f"Rate limit (attempt {attempt + 1}/{max_retries})"
                 if attempt < max_retries - 1:
-                    time.sleep(5)  # Fixed 5s for rate limits
+                    _backoff_sleep(5)  # Fixed 5s for rate limits
             elif 500 <= status < 600:  # Server errors - retry
                 last_error = f"HTTP {status} (attempt {attempt + 1}/{max_retries})"
                 if attempt < max_retries - 1:
-                    time.sleep(delay)
+                    _backoff_sleep(delay)
                     delay *= backoff_factor
             else:  # 4xx client errors - don't retry
                 last_error = f"HTTP {status}: {e.response.text[:100]}"
                 break
                 
+        except requests.exceptions.ConnectionError:
+            # Dropped/reset connections are transient - retry like timeouts
+            last_error = f"Connection error (attempt {attempt + 1}/{max_retries})"
+            if attempt < max_retries - 1:
+                _backoff_sleep(delay)
+                delay *= backoff_factor
+
         except Exception as e:
             last_error = f"{type(e).__name__}: {str(e)}"
             break  # Unknown errors - don't retry
@@ -754,9 +1433,9 @@ def download_fit_file_with_retry(athlete: dict, activity_id: str) -> Tuple[Optio
     """Download FIT file with retry logic"""
 
     def _download():
-        response = requests.get(
+        response = HTTP_SESSION.get(
             f"{BASE_URL}/activity/{activity_id}/file",
-            auth=HTTPBasicAuth('API_KEY', athlete['api_key']),
+            auth=intervals_auth(athlete['api_key']),
             timeout=60,
             stream=True
         )
@@ -767,37 +1446,61 @@ def download_fit_file_with_retry(athlete: dict, activity_id: str) -> Tuple[Optio
     return content, error
 
 
-def get_existing_activity_ids(athlete_id: str) -> set:
+def get_existing_activity_ids(athlete_id: str, activity_ids: List[str]) -> FrozenSet[str]:
     """
-    Get set of activity_ids already in database for this athlete.
+    Get the subset of activity_ids already in database for this athlete.
     Used for duplicate prevention during bulk import.
 
+    Only the incoming IDs are checked (activity_id=in.(...)), so the
+    response is bounded by the import window rather than the athlete's
+    full history.
+
     Args:
         athlete_id: The athlete's Intervals.icu ID
+        activity_ids: Activity IDs about to be imported
 
     Returns:
-        Set of activity_id strings already in database
+        Frozenset of activity_id strings already in database
+    """
+    existing = fetch_existing_activity_ids(athlete_id, activity_ids)
+    return existing if existing is not None else frozenset()
+
+def fetch_existing_activity_ids(athlete_id: str, activity_ids: List[str]) -> Optional[FrozenSet[str]]:
+    """
+    Same lookup as get_existing_activity_ids, but None when it fails.
+
+    Used after a lost ingest RPC response, where "unknown" must not be
+    mistaken for "not inserted".
     """
     url = f"{SUPABASE_URL}/rest/v1/activity_metadata"
-    headers = {
-        "apikey": SUPABASE_KEY,
-        "Authorization": f"Bearer {SUPABASE_KEY}"
-    }
-    params = {
-        "select": "activity_id",
-        "athlete_id": f"eq.{athlete_id}"
-    }
 
-    try:
-        response = requests.get(url, headers=headers, params=params, timeout=30)
-        if response.status_code == 200:
-            return set(row['activity_id'] for row in response.json())
-        else:
-            log(f"  Warning: Could not fetch existing activity_ids: {response.status_code}", "WARNING")
-            return set()
-    except Exception as e:
-        log(f"  Warning: Error fetching existing activity_ids: {e}", "WARNING")
-        return set()
+    existing = set()
+    # Chunk the IN list to keep the query string well under URL limits
+    for i in range(0, len(activity_ids), EXISTING_IDS_CHUNK_SIZE):
+        chunk = activity_ids[i:i + EXISTING_IDS_CHUNK_SIZE]
+        params = {
+            "select": "activity_id",
+            "athlete_id": f"eq.{athlete_id}",
+            "activity_id": "in.(" + ",".join(f'"{activity_id}"' for activity_id in chunk) + ")"
+        }
+
+        try:
+            response = SUPABASE_REST_SESSION.get(url, params=params, timeout=30)
+            if response.status_code == 200:
+                existing.update(row['activity_id'] for row in orjson.loads(response.content))
+            else:
+                log(f"  Warning: Could not fetch existing activity_ids: {response.status_code}", "WARNING")
+                return None
+        except Exception as e:
+            log(f"  Warning: Error fetching existing activity_ids: {e}", "WARNING")
+            return None
+
+    return frozenset(existing)
+
+@functools.lru_cache(maxsize=None)
+def intervals_auth(api_key: str) -> HTTPBasicAuth:
+    """Auth Intervals.icu, construite une fois par clé API (par athlète)"""
+    return HTTPBasicAuth("API_KEY", api_key)
 
 def load_athletes(athlete_filter: Optional[str] = None) -> List[Dict]:
     """Charger les athlètes"""
@@ -824,10 +1527,10 @@ def get_activities(athlete: Dict, oldest: str, newest: str) -> List[Dict]:
     try:
         url = f"{BASE_URL}/athlete/{athlete_id}/activities"
         params = {"oldest": oldest, "newest": newest}
-        response = requests.get(url, auth=HTTPBasicAuth("API_KEY", api_key), params=params, timeout=30)
+        response = HTTP_SESSION.get(url, auth=intervals_auth(api_key), params=params, timeout=30)
         
         if response.status_code == 200:
-            activities = response.json()
+            activities = orjson.loads(response.content)
             # Return ALL activities (running and cross-training)
             return activities
         return []
@@ -835,17 +1538,36 @@ def get_activities(athlete: Dict, oldest: str, newest: str) -> List[Dict]:
         log(f"Erreur get_activities: {e}", "ERROR")
         return []
 
+# Streams lus par parse_streams_to_records (les autres types sont ignorés)
+STREAM_TYPES = (
+    'time', 'latlng', 'altitude', 'fixed_altitude',
+    'velocity_smooth', 'heartrate', 'cadence', 'watts'
+)
+
 def get_streams(athlete: Dict, activity_id: str) -> Optional[Dict]:
     """Récupérer les streams (fallback) avec retry (Phase 1)"""
     
     def _fetch_streams():
-        response = requests.get(
+        response = HTTP_SESSION.get(
             f"{BASE_URL}/activity/{activity_id}/streams.json",
-            auth=HTTPBasicAuth("API_KEY", athlete["api_key"]),
-            timeout=20
+            auth=intervals_auth(athlete["api_key"]),
+            timeout=20,
+            stream=True
         )
         response.raise_for_status()
-        return response.json()
+        # Décodage incrémental: un stream à la fois, sans garder le corps
+        # complet ni les streams inutilisés en mémoire. Chaque stream est
+        # converti tout de suite en array float64 (None -> NaN): la liste
+        # Python décodée est libérée avant le stream suivant.
+        response.raw.decode_content = True
+        streams_dict = {}
+        try:
+            for stream_obj in ijson.items(response.raw, 'item', use_float=True):
+                if isinstance(stream_obj, dict) and stream_obj.get('type') in STREAM_TYPES:
+                    streams_dict[stream_obj['type']] = np.asarray(stream_obj.get('data') or [], dtype=np.float64)
+        finally:
+            response.close()
+        return streams_dict
     
     try:
         streams, error = retry_with_exponential_backoff(_fetch_streams, max_retries=3)
@@ -854,15 +1576,6 @@ def get_streams(athlete: Dict, activity_id: str) -> Optional[Dict]:
             log(f"  Streams API failed: {error}", "ERROR")
             return None
         
-        # Convertir liste en dict si nécessaire
-        if isinstance(streams, list):
-            streams_dict = {}
-            for stream_obj in streams:
-                if isinstance(stream_obj, dict):
-                    stream_name = stream_obj.get('type', '')
-                    stream_data = stream_obj.get('data', [])
-                    streams_dict[stream_name] = stream_data
-            return streams_dict
         return streams
         
     except Exception as e:
@@ -886,23 +1599,98 @@ def enrich_intervals_with_active_time(intervals: List[Dict], records: List[Dict]
     if not intervals or not records:
         return intervals
     
+    # Accès direct aux seuls records référencés: O(intervals), pas O(records)
+    num_records = len(records)
+    
+    def t_active_at(idx):
+        if idx is not None and idx < num_records:
+            return records[idx].get('t_active_sec', 0.0)
+        return None
+    
     for interval in intervals:
-        start_idx = interval.get('start_index')
-        end_idx = interval.get('end_index')
-        
-        # Utiliser les indices pour trouver le temps actif
-        if start_idx is not None and start_idx < len(records):
-            interval['start_t_active'] = records[start_idx].get('t_active_sec', 0.0)
-        else:
-            interval['start_t_active'] = None
-        
-        if end_idx is not None and end_idx < len(records):
-            interval['end_t_active'] = records[end_idx].get('t_active_sec', 0.0)
-        else:
-            interval['end_t_active'] = None
+        interval['start_t_active'] = t_active_at(interval.get('start_index'))
+        interval['end_t_active'] = t_active_at(interval.get('end_index'))
     
     return intervals
 
+# Intervals.icu -> colonnes activity_intervals: (colonne, clé de l'API)
+INTERVAL_FIELDS = (
+    ('interval_id', 'id'),
+    ('start_index', 'start_index'),
+    ('end_index', 'end_index'),
+    ('start_time', 'start_time'),
+    ('end_time', 'end_time'),
+    ('type', 'type'),
+    ('distance', 'distance'),
+    ('moving_time', 'moving_time'),
+    ('elapsed_time', 'elapsed_time'),
+    ('average_watts', 'average_watts'),
+    ('min_watts', 'min_watts'),
+    ('max_watts', 'max_watts'),
+    ('average_watts_kg', 'average_watts_kg'),
+    ('max_watts_kg', 'max_watts_kg'),
+    ('intensity', 'intensity'),
+    ('weighted_average_watts', 'weighted_average_watts'),
+    ('training_load', 'training_load'),
+    ('joules', 'joules'),
+    ('decoupling', 'decoupling'),
+    ('zone', 'zone'),
+    ('zone_min_watts', 'zone_min_watts'),
+    ('zone_max_watts', 'zone_max_watts'),
+    ('average_speed', 'average_speed'),
+    ('min_speed', 'min_speed'),
+    ('max_speed', 'max_speed'),
+    ('average_heartrate', 'average_heartrate'),
+    ('min_heartrate', 'min_heartrate'),
+    ('max_heartrate', 'max_heartrate'),
+    ('average_cadence', 'average_cadence'),
+    ('min_cadence', 'min_cadence'),
+    ('max_cadence', 'max_cadence'),
+    ('average_torque', 'average_torque'),
+    ('min_torque', 'min_torque'),
+    ('max_torque', 'max_torque'),
+    ('total_elevation_gain', 'total_elevation_gain'),
+    ('min_altitude', 'min_altitude'),
+    ('max_altitude', 'max_altitude'),
+    ('average_gradient', 'average_gradient'),
+    ('group_id', 'group_id'),
+)
+
+# Colonnes INTEGER (les autres, REAL/TEXT, gardent la valeur d'origine)
+INTERVAL_INT_COLUMNS = frozenset((
+    'interval_id', 'start_index', 'end_index', 'start_time',
+    'end_time', 'moving_time', 'elapsed_time', 'zone',
+    'average_heartrate', 'min_heartrate', 'max_heartrate', 'average_cadence',
+    'min_cadence', 'max_cadence', 'group_id',
+))
+
+def to_int(val):
+    """Convertir en int arrondi si non-null (None si non numérique)"""
+    if val is None:
+        return None
+    # Cas courant: entier JSON déjà correct, pas de float()/round()/try
+    if type(val) is int:
+        return val
+    try:
+        # Handle numeric types (int, float)
+        return int(round(float(val)))
+    except (ValueError, TypeError):
+        # If conversion fails (e.g., string), return None
+        return None
+
+# Pool partagé pour les intervals demandés pendant le téléchargement FIT /
+# streams (une requête par activité en cours: même taille que --activity-workers)
+INTERVALS_WORKERS = int(os.environ.get("INTERVALS_WORKERS", "8"))
+INTERVALS_EXECUTOR = ThreadPoolExecutor(max_workers=INTERVALS_WORKERS, thread_name_prefix="intervals")
+
+def _discard_future(future):
+    """Abandonner un résultat devenu inutile: annulé s'il n'a pas démarré, sinon attendu"""
+    if not future.cancel():
+        try:
+            future.result()
+        except Exception:
+            pass
+
 def get_intervals(athlete: Dict, activity_id: str) -> List[Dict]:
     """Récupérer les intervals d'une activité"""
     api_key = athlete["api_key"]
@@ -910,151 +1698,280 @@ def get_intervals(athlete: Dict, activity_id: str) -> List[Dict]:
     try:
         url = f"{BASE_URL}/activity/{activity_id}"
         params = {"intervals": "true"}
-        response = requests.get(url, auth=HTTPBasicAuth("API_KEY", api_key), params=params, timeout=15)
+        response = HTTP_SESSION.get(url, auth=intervals_auth(api_key), params=params, timeout=15)
         
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             intervals = data.get('icu_intervals', [])
             
             # Préparer pour insertion
             formatted_intervals = []
             for interval in intervals:
-                # Helper pour convertir en int si non-null
-                def to_int(val):
-                    if val is None:
-                        return None
-                    try:
-                        # Handle numeric types (int, float)
-                        return int(round(float(val)))
-                    except (ValueError, TypeError):
-                        # If conversion fails (e.g., string), return None
-                        return None
-                
-                formatted_intervals.append({
-                    'activity_id': activity_id,
-                    'interval_id': to_int(interval.get('id')),
-                    'start_index': to_int(interval.get('start_index')),
-                    'end_index': to_int(interval.get('end_index')),
-                    'start_time': to_int(interval.get('start_time')),
-                    'end_time': to_int(interval.get('end_time')),
-                    'type': interval.get('type'),
-                    'distance': interval.get('distance'),
-                    'moving_time': to_int(interval.get('moving_time')),
-                    'elapsed_time': to_int(interval.get('elapsed_time')),
-                    'average_watts': interval.get('average_watts'),
-                    'min_watts': interval.get('min_watts'),  # REAL - keep decimal precision
-                    'max_watts': interval.get('max_watts'),  # REAL - keep decimal precision
-                    'average_watts_kg': interval.get('average_watts_kg'),
-                    'max_watts_kg': interval.get('max_watts_kg'),
-                    'intensity': interval.get('intensity'),  # TEXT - keep original value
-                    'weighted_average_watts': interval.get('weighted_average_watts'),
-                    'training_load': interval.get('training_load'),
-                    'joules': interval.get('joules'),  # REAL - keep decimal precision
-                    'decoupling': interval.get('decoupling'),
-                    'zone': to_int(interval.get('zone')),
-                    'zone_min_watts': interval.get('zone_min_watts'),  # REAL - keep decimal precision
-                    'zone_max_watts': interval.get('zone_max_watts'),  # REAL - keep decimal precision
-                    'average_speed': interval.get('average_speed'),
-                    'min_speed': interval.get('min_speed'),
-                    'max_speed': interval.get('max_speed'),
-                    'average_heartrate': to_int(interval.get('average_heartrate')),
-                    'min_heartrate': to_int(interval.get('min_heartrate')),
-                    'max_heartrate': to_int(interval.get('max_heartrate')),
-                    'average_cadence': to_int(interval.get('average_cadence')),
-                    'min_cadence': to_int(interval.get('min_cadence')),
-                    'max_cadence': to_int(interval.get('max_cadence')),
-                    'average_torque': interval.get('average_torque'),  # REAL - keep decimal precision
-                    'min_torque': interval.get('min_torque'),  # REAL - keep decimal precision
-                    'max_torque': interval.get('max_torque'),  # REAL - keep decimal precision
-                    'total_elevation_gain': interval.get('total_elevation_gain'),
-                    'min_altitude': interval.get('min_altitude'),
-                    'max_altitude': interval.get('max_altitude'),
-                    'average_gradient': interval.get('average_gradient'),
-                    'group_id': to_int(interval.get('group_id'))
-                })
+                formatted = {'activity_id': activity_id}
+                for column, key in INTERVAL_FIELDS:
+                    value = interval.get(key)
+                    formatted[column] = to_int(value) if column in INTERVAL_INT_COLUMNS else value
+                formatted_intervals.append(formatted)
             
             return formatted_intervals
         return []
     except Exception as e:
-        log(f"  Erreur get_intervals: {e}", "WARNING")
+        # Thread INTERVALS_EXECUTOR: pas de contexte de log, id explicite
+        log(f"  Erreur get_intervals ({activity_id}): {e}", "WARNING")
         return []
 
-def parse_streams_to_records(streams: Dict, activity_id: str, activity_type: str = 'run') -> List[Dict]:
-    """Parser les streams en records Supabase"""
+def _stream_column(streams: Dict, name: str, num_points: int) -> np.ndarray:
+    """Stream -> colonne float64 de longueur num_points (None / absent -> NaN)"""
+    values = np.full(num_points, np.nan)
+    data = streams.get(name)
+    if data is not None and len(data):
+        arr = np.asarray(data[:num_points], dtype=np.float64)
+        values[:arr.size] = arr
+    return values
+
+def _column_values(values: np.ndarray, as_int: bool = False) -> list:
+    """Colonne NumPy -> liste Python (float ou int tronqué), None là où NaN"""
+    missing = np.isnan(values)
+    if as_int:
+        values = np.trunc(np.where(missing, 0.0, values)).astype(np.int64)
+    return np.where(missing, None, values.astype(object)).tolist()
+
+def _columns_to_records(activity_id: str, num_points: int, columns: List[Tuple[str, list]]) -> List[Dict]:
+    """Matérialiser les dicts une seule fois, en sautant les valeurs absentes (None)"""
     records = []
-    
-    # Obtenir la longueur des streams
-    time_data = streams.get('time', [])
-    if not time_data:
-        return []
-    
-    num_points = len(time_data)
-    
     for i in range(num_points):
         point = {
             'activity_id': activity_id,
             'ts_offset_ms': i * 1000  # Approximation: 1 point par seconde
         }
-        
-        # Time
-        if 'time' in streams and i < len(streams['time']):
-            val = streams['time'][i]
-            if val is not None:
-                point['time'] = float(val)
-        
-        # Position (latlng est un array alterné [lat1, lng1, lat2, lng2, ...])
-        if 'latlng' in streams:
-            latlng = streams['latlng']
-            if i * 2 + 1 < len(latlng):
-                lat_val = latlng[i * 2]
-                lng_val = latlng[i * 2 + 1]
-                if lat_val is not None and lng_val is not None:
-                    point['lat'] = float(lat_val)
-                    point['lng'] = float(lng_val)
-        
-        # Altitude
-        if 'altitude' in streams and i < len(streams['altitude']):
-            val = streams['altitude'][i]
+        for key, values in columns:
+            val = values[i]
             if val is not None:
-                point['enhanced_altitude'] = float(val)
-        elif 'fixed_altitude' in streams and i < len(streams['fixed_altitude']):
-            val = streams['fixed_altitude'][i]
-            if val is not None:
-                point['enhanced_altitude'] = float(val)
-        
-        # Vitesse
-        if 'velocity_smooth' in streams and i < len(streams['velocity_smooth']):
-            val = streams['velocity_smooth'][i]
-            if val is not None:
-                vel = float(val)
-                point['velocity_smooth'] = vel
-                point['enhanced_speed'] = vel
-                point['speed'] = vel
-        
-        # Fréquence cardiaque
-        if 'heartrate' in streams and i < len(streams['heartrate']):
-            val = streams['heartrate'][i]
-            if val is not None:
-                point['heartrate'] = int(val)
-        
-        # Cadence
-        if 'cadence' in streams and i < len(streams['cadence']):
-            val = streams['cadence'][i]
-            if val is not None:
-                point['cadence'] = int(val)
-        
-        # Puissance (rare dans streams)
-        if 'watts' in streams and i < len(streams['watts']):
-            val = streams['watts'][i]
-            if val is not None:
-                point['watts'] = float(val)
-
+                point[key] = val
         records.append(point)
+    return records
+
+def parse_streams_to_records(streams: Dict, activity_id: str, activity_type: str = 'run') -> List[Dict]:
+    """Parser les streams en records Supabase"""
+    # Obtenir la longueur des streams
+    time_data = streams.get('time')
+    if time_data is None or not len(time_data):
+        return []
+    
+    num_points = len(time_data)
+    
+    # Conversion vectorisée: une colonne NumPy par stream, NaN = valeur absente
+    time_col = _stream_column(streams, 'time', num_points)
+    
+    # Position (latlng est un array alterné [lat1, lng1, lat2, lng2, ...])
+    lat_col = np.full(num_points, np.nan)
+    lng_col = np.full(num_points, np.nan)
+    latlng = streams.get('latlng')
+    if latlng is not None and len(latlng):
+        pairs = min(len(latlng) // 2, num_points)
+        latlng_arr = np.asarray(latlng[:pairs * 2], dtype=np.float64)
+        lat_col[:pairs] = latlng_arr[0::2]
+        lng_col[:pairs] = latlng_arr[1::2]
+        no_fix = np.isnan(lat_col) | np.isnan(lng_col)
+        lat_col[no_fix] = np.nan
+        lng_col[no_fix] = np.nan
+    
+    # Altitude (fixed_altitude seulement au-delà de la longueur d'altitude)
+    altitude_col = _stream_column(streams, 'altitude', num_points)
+    if 'fixed_altitude' in streams:
+        altitude_len = len(streams['altitude']) if 'altitude' in streams else 0
+        altitude_col[altitude_len:] = _stream_column(streams, 'fixed_altitude', num_points)[altitude_len:]
+    
+    velocity = _column_values(_stream_column(streams, 'velocity_smooth', num_points))
+    
+    # Colonnes dans l'ordre des clés des records
+    columns = [
+        ('time', _column_values(time_col)),
+        ('lat', _column_values(lat_col)),
+        ('lng', _column_values(lng_col)),
+        ('enhanced_altitude', _column_values(altitude_col)),
+        ('velocity_smooth', velocity),
+        ('enhanced_speed', velocity),
+        ('speed', velocity),
+        ('heartrate', _column_values(_stream_column(streams, 'heartrate', num_points), as_int=True)),
+        ('cadence', _column_values(_stream_column(streams, 'cadence', num_points), as_int=True)),
+        ('watts', _column_values(_stream_column(streams, 'watts', num_points))),
+    ]
+    
+    records = _columns_to_records(activity_id, num_points, columns)
 
     # *** NOUVEAU : Calculer t_active_sec via algorithme Strava ***
     records = compute_t_active_for_records(records, activity_type=activity_type)
 
-    return records
+    return records
+
+def first_stream_latlng(streams: Dict, num_points: int) -> Tuple[Optional[float], Optional[float]]:
+    """Premier point (lat, lng) sans NaN du stream latlng alterné, (None, None) sinon"""
+    latlng = streams.get('latlng')
+    if latlng is None or not len(latlng):
+        return None, None
+    pairs = min(len(latlng) // 2, num_points)
+    latlng_pairs = np.asarray(latlng[:pairs * 2], dtype=np.float64).reshape(-1, 2)
+    valid = np.flatnonzero(~np.isnan(latlng_pairs).any(axis=1))
+    if not valid.size:
+        return None, None
+    lat, lng = latlng_pairs[valid[0]]
+    return float(lat), float(lng)
+
+# Messages FIT utilisés par download_and_parse_fit
+FIT_MESSAGES = ('session', 'record')
+
+# Champ FIT 'record' -> colonne brute (les priorités enhanced_*/power sont
+# résolues après coup, colonne par colonne)
+FIT_RECORD_COLUMNS = {
+    'position_lat': 'lat',
+    'position_long': 'lng',
+    'enhanced_altitude': 'enhanced_altitude',
+    'altitude': 'altitude',
+    'enhanced_speed': 'enhanced_speed',
+    'speed': 'speed',
+    'heart_rate': 'heartrate',
+    'cadence': 'cadence',
+    'power': 'power',
+    'accumulated_power': 'accumulated_power',
+    # Données Stryd
+    'vertical_oscillation': 'vertical_oscillation',
+    'stance_time': 'ground_contact_time',
+    'stance_time_percent': 'stance_time_percent',
+    'stance_time_balance': 'stance_time_balance',
+    'vertical_ratio': 'vertical_ratio',
+    'step_length': 'step_length',
+    'Leg Spring Stiffness': 'leg_spring_stiffness',
+}
+
+# Positions FIT en semicircles (int32): degrés = semicircles * 180 / 2^31
+SEMICIRCLES_TO_DEGREES = 180.0 / (1 << 31)
+
+# Champ FIT 'session' -> (clé metadata, conversion)
+FIT_SESSION_FIELDS = {
+    'start_time': ('start_time', datetime.isoformat),
+    # Use total_timer_time (moving time) instead of total_elapsed_time
+    'total_timer_time': ('duration_sec', int),
+    'total_distance': ('distance_m', int),
+    'avg_heart_rate': ('avg_hr', int),
+    'sport': ('type', str),
+}
+
+# Colonnes Stryd copiées telles quelles dans les records
+FIT_STRYD_COLUMNS = (
+    'vertical_oscillation', 'ground_contact_time', 'stance_time_percent',
+    'stance_time_balance', 'vertical_ratio', 'step_length', 'leg_spring_stiffness',
+)
+
+def _naive_utc(value):
+    """fitdecode renvoie des datetimes UTC 'aware'; fitparse des datetimes naïfs en UTC"""
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+class _StreamingFitFile(FitFile):
+    """
+    FitFile qui ne garde pas les messages déjà lus.
+
+    fitparse ajoute chaque message parsé à self._messages (pour pouvoir
+    itérer plusieurs fois): sur une longue sortie, toute l'activité reste
+    en mémoire. Ici get_messages() est parcouru une seule fois, donc le
+    message est oublié dès qu'il a été rendu.
+    """
+    def _parse_message(self):
+        message = super()._parse_message()
+        self._messages.clear()
+        return message
+
+def parse_fit_messages(fit_content: bytes) -> List[Tuple[str, List[Tuple[str, object]]]]:
+    """
+    Lire les messages session/record d'un fichier FIT en une seule passe.
+
+    fitdecode en priorité (nettement plus rapide), fitparse en secours si
+    fitdecode échoue sur le fichier. Les valeurs sont normalisées comme
+    fitparse (timestamps naïfs en UTC) pour que la suite du pipeline
+    reste identique.
+
+    Returns:
+        Liste de (nom_message, [(nom_champ, valeur), ...]) dans l'ordre du fichier
+    """
+    # CRC non vérifié: le fichier vient d'Intervals.icu (déjà validé à
+    # l'upload) via HTTPS, et le calcul CRC octet par octet coûte cher.
+    # io.BytesIO(bytes) partage le buffer (pas de copie).
+    try:
+        messages = []
+        with fitdecode.FitReader(io.BytesIO(fit_content), check_crc=fitdecode.CrcCheck.DISABLED) as fit:
+            for frame in fit:
+                if frame.frame_type == fitdecode.FIT_FRAME_DATA and frame.name in FIT_MESSAGES:
+                    messages.append((
+                        frame.name,
+                        [(field.name, _naive_utc(field.value)) for field in frame.fields]
+                    ))
+        return messages
+    except Exception as e:
+        log(f"  fitdecode failed ({str(e)[:80]}), fallback fitparse", "WARNING")
+
+    fit_file = _StreamingFitFile(io.BytesIO(fit_content), check_crc=False)
+    return [
+        (message.name, [(field.name, field.value) for field in message])
+        for message in fit_file.get_messages(list(FIT_MESSAGES))
+    ]
+
+def parse_fit_records(fit_messages: List[Tuple[str, List[Tuple[str, object]]]],
+                      activity_id: str) -> Tuple[List[Dict], Optional[datetime]]:
+    """
+    Convertir les messages 'record' FIT en records Supabase.
+
+    Les valeurs sont d'abord rangées dans des colonnes NumPy préallouées
+    (NaN = absent), puis les priorités sont appliquées en vectorisé:
+    enhanced_altitude > altitude, enhanced_speed > speed, power >
+    accumulated_power (65535 = invalide).
+
+    Returns:
+        (records, timestamp du premier record)
+    """
+    record_fields = [fields for name, fields in fit_messages if name == 'record']
+    num_points = len(record_fields)
+    columns = {col: np.full(num_points, np.nan) for col in FIT_RECORD_COLUMNS.values()}
+    time_col = np.full(num_points, np.nan)
+    start_timestamp = None
+
+    for i, fields in enumerate(record_fields):
+        for name, value in fields:
+            if name == 'timestamp':
+                if start_timestamp is None:
+                    start_timestamp = value
+                time_col[i] = (value - start_timestamp).total_seconds()
+                continue
+            col = FIT_RECORD_COLUMNS.get(name)
+            if col is not None and value is not None:
+                columns[col][i] = value
+
+    # Semicircles -> degrés, en place sur toute la colonne
+    columns['lat'] *= SEMICIRCLES_TO_DEGREES
+    columns['lng'] *= SEMICIRCLES_TO_DEGREES
+
+    enhanced_speed = np.where(np.isnan(columns['enhanced_speed']), columns['speed'], columns['enhanced_speed'])
+    enhanced_speed_values = _column_values(enhanced_speed)
+    accumulated_power = columns['accumulated_power']
+    accumulated_power[accumulated_power == 65535] = np.nan
+
+    ordered = [
+        ('time', _column_values(time_col)),
+        ('lat', _column_values(columns['lat'])),
+        ('lng', _column_values(columns['lng'])),
+        ('enhanced_altitude', _column_values(np.where(
+            np.isnan(columns['enhanced_altitude']), columns['altitude'], columns['enhanced_altitude']))),
+        ('enhanced_speed', enhanced_speed_values),
+        ('velocity_smooth', enhanced_speed_values),
+        ('speed', _column_values(columns['speed'])),
+        ('heartrate', _column_values(columns['heartrate'], as_int=True)),
+        ('cadence', _column_values(columns['cadence'], as_int=True)),
+        ('watts', _column_values(np.where(np.isnan(columns['power']), accumulated_power, columns['power']))),
+    ]
+    ordered.extend((col, _column_values(columns[col])) for col in FIT_STRYD_COLUMNS)
+
+    return _columns_to_records(activity_id, num_points, ordered), start_timestamp
 
 def download_and_parse_fit(athlete: Dict, activity_id: str, athlete_id: str) -> Tuple[Optional[List[Dict]], Optional[Dict], bool]:
     """
@@ -1074,9 +1991,8 @@ def download_and_parse_fit(athlete: Dict, activity_id: str, athlete_id: str) ->
         log(f"  FIT téléchargé ({len(fit_content):,} bytes)")
         
         # Parser
-        fit_file = FitFile(io.BytesIO(fit_content))
+        fit_messages = parse_fit_messages(fit_content)
         
-        records = []
         metadata = {
             'activity_id': activity_id,
             'athlete_id': athlete_id,
@@ -1085,85 +2001,17 @@ def download_and_parse_fit(athlete: Dict, activity_id: str, athlete_id: str) ->
         }
         
         # Métadonnées de session
-        for session in fit_file.get_messages('session'):
-            for field in session:
-                if field.name == 'start_time':
-                    metadata['start_time'] = field.value.isoformat()
-                elif field.name == 'total_timer_time':
-                    # Use total_timer_time (moving time) instead of total_elapsed_time
-                    metadata['duration_sec'] = int(field.value)
-                elif field.name == 'total_distance':
-                    metadata['distance_m'] = int(field.value)
-                elif field.name == 'avg_heart_rate':
-                    metadata['avg_hr'] = int(field.value)
-                elif field.name == 'sport':
-                    metadata['type'] = field.value
-        
-        # Records
-        ts_offset_ms = 0
-        start_timestamp = None
+        for message_name, fields in fit_messages:
+            if message_name != 'session':
+                continue
+            for name, value in fields:
+                entry = FIT_SESSION_FIELDS.get(name)
+                if entry is not None and value is not None:
+                    key, convert = entry
+                    metadata[key] = convert(value)
         
-        for record in fit_file.get_messages('record'):
-            point = {
-                'activity_id': activity_id,
-                'ts_offset_ms': ts_offset_ms
-            }
-            
-            for field in record:
-                if field.name == 'timestamp':
-                    if start_timestamp is None:
-                        start_timestamp = field.value
-                    point['time'] = (field.value - start_timestamp).total_seconds()
-                
-                elif field.name == 'position_lat' and field.value is not None:
-                    point['lat'] = field.value * (180.0 / 2**31)
-                elif field.name == 'position_long' and field.value is not None:
-                    point['lng'] = field.value * (180.0 / 2**31)
-                
-                elif field.name == 'enhanced_altitude' and field.value is not None:
-                    point['enhanced_altitude'] = float(field.value)
-                elif field.name == 'altitude' and field.value is not None and 'enhanced_altitude' not in point:
-                    point['enhanced_altitude'] = float(field.value)
-                
-                elif field.name == 'enhanced_speed' and field.value is not None:
-                    point['enhanced_speed'] = float(field.value)
-                    point['velocity_smooth'] = float(field.value)
-                elif field.name == 'speed' and field.value is not None:
-                    point['speed'] = float(field.value)
-                    if 'enhanced_speed' not in point:
-                        point['enhanced_speed'] = float(field.value)
-                        point['velocity_smooth'] = float(field.value)
-                
-                elif field.name == 'heart_rate' and field.value is not None:
-                    point['heartrate'] = int(field.value)
-                
-                elif field.name == 'cadence' and field.value is not None:
-                    point['cadence'] = int(field.value)
-                
-                elif field.name == 'power' and field.value is not None:
-                    point['watts'] = float(field.value)
-                elif field.name == 'accumulated_power' and field.value is not None and field.value != 65535:
-                    if 'watts' not in point:
-                        point['watts'] = float(field.value)
-                
-                # Données Stryd
-                elif field.name == 'vertical_oscillation' and field.value is not None:
-                    point['vertical_oscillation'] = float(field.value)
-                elif field.name == 'stance_time' and field.value is not None:
-                    point['ground_contact_time'] = float(field.value)
-                elif field.name == 'stance_time_percent' and field.value is not None:
-                    point['stance_time_percent'] = float(field.value)
-                elif field.name == 'stance_time_balance' and field.value is not None:
-                    point['stance_time_balance'] = float(field.value)
-                elif field.name == 'vertical_ratio' and field.value is not None:
-                    point['vertical_ratio'] = float(field.value)
-                elif field.name == 'step_length' and field.value is not None:
-                    point['step_length'] = float(field.value)
-                elif field.name == 'Leg Spring Stiffness' and field.value is not None:
-                    point['leg_spring_stiffness'] = float(field.value)
-
-            records.append(point)
-            ts_offset_ms += 1000
+        # Records (parsing colonne par colonne)
+        records, start_timestamp = parse_fit_records(fit_messages, activity_id)
 
         # *** NOUVEAU : Calculer t_active_sec via algorithme Strava ***
         records = compute_t_active_for_records(records, activity_type=metadata.get('type', 'Run').lower())
@@ -1188,7 +2036,7 @@ def download_and_parse_fit(athlete: Dict, activity_id: str, athlete_id: str) ->
             # Check if we have HR data in records to track HR monitor usage
             hr_in_records = any(rec.get('heartrate') for rec in records)
             if hr_in_records:
-                stats['hr_monitor_used'] += 1
+                bump_stat('hr_monitor_used')
                 
             # Use enhanced HR fallback
             enhanced_avg_hr = get_avg_hr_with_fallback(metadata, {}, records)
@@ -1202,85 +2050,292 @@ def download_and_parse_fit(athlete: Dict, activity_id: str, athlete_id: str) ->
         log(f"  Erreur FIT: {str(e)[:100]}", "WARNING")
         return None, None, False
 
-def insert_records_batch_with_retry(records_url: str, headers: dict, batch: List[Dict], max_retries: int = 3) -> Tuple[bool, Optional[str]]:
+def insert_records_batch_with_retry(records_url: str, headers: dict, batch: List[Dict]) -> Tuple[bool, Optional[str]]:
     """
-    Insert a batch of records with retry logic.
+    Insert a batch of records.
+
+    Plain INSERT (activity has no unique key): SUPABASE_INSERT_SESSION only
+    retries connection errors, never a request the server may have applied.
+    This only translates the outcome.
 
     Args:
         records_url: Supabase REST API URL for records table
-        headers: Request headers with auth
+        headers: Extra request headers (auth is set on SUPABASE_REST_SESSION)
         batch: List of record dicts to insert
-        max_retries: Number of retry attempts
 
     Returns:
         (success, error_message)
     """
-    for attempt in range(max_retries):
-        try:
-            response = requests.post(records_url, headers=headers, json=batch, timeout=60)
-            if response.status_code in [200, 201]:
-                return True, None
-
-            error_msg = f"HTTP {response.status_code}: {response.text[:200]}"
-
-            # Don't retry on client errors (4xx) except 429 (rate limit)
-            if 400 <= response.status_code < 500 and response.status_code != 429:
-                return False, error_msg
-
-            # Rate limit - wait longer
-            if response.status_code == 429:
-                if attempt < max_retries - 1:
-                    log(f"    Rate limited, waiting 5s...", "WARNING")
-                    time.sleep(5)
-                continue
-
-        except requests.exceptions.Timeout as e:
-            error_msg = f"Timeout: {str(e)}"
-        except requests.exceptions.RequestException as e:
-            error_msg = f"Request error: {str(e)}"
+    body, headers = supabase_body(batch, headers)
+    try:
+        response = SUPABASE_INSERT_SESSION.post(records_url, headers=headers, data=body, timeout=60)
+    except requests.exceptions.Timeout as e:
+        return False, f"Timeout: {str(e)}"
+    except requests.exceptions.RequestException as e:
+        return False, f"Request error: {str(e)}"
 
-        if attempt < max_retries - 1:
-            delay = (2 ** attempt)  # 1s, 2s, 4s
-            log(f"    Batch insert failed (attempt {attempt+1}), retrying in {delay}s...", "WARNING")
-            time.sleep(delay)
+    if response.status_code in [200, 201]:
+        return True, None
+    return False, f"HTTP {response.status_code}: {response.text[:200]}"
 
-    return False, error_msg
 
+# Colonnes INTEGER côté Supabase: les floats y sont arrondis avant insertion
+NORMALIZE_INT_COLUMNS = frozenset({
+    'heartrate', 'cadence', 'watts', 'time', 'ts_offset_ms',
+    'enhanced_altitude', 't_active_sec'
+})
 
 def normalize_records(records: List[Dict]) -> List[Dict]:
     """Normaliser les records pour que tous aient les mêmes clés (fix PGRST102)"""
     if not records:
         return records
 
-    # Collecter toutes les clés uniques
-    all_keys = set()
-    for record in records:
-        all_keys.update(record.keys())
-
-    # Define INTEGER columns that need conversion from float to int
-    INTEGER_COLUMNS = {
-        'heartrate', 'cadence', 'watts', 'time', 'ts_offset_ms',
-        'enhanced_altitude', 't_active_sec'
-    }
+    # Collecter toutes les clés uniques (ordre fixe pour tous les records)
+    all_keys = tuple(set().union(*(record.keys() for record in records)))
+    int_keys = NORMALIZE_INT_COLUMNS.intersection(all_keys)
 
-    # Normaliser chaque record
+    # Normaliser chaque record: clés manquantes à None, puis valeurs du record
     normalized = []
     for record in records:
-        normalized_record = {}
-        for key in all_keys:
-            value = record.get(key)
-            # Convert floats to integers for INTEGER columns
-            if key in INTEGER_COLUMNS and value is not None:
-                try:
-                    normalized_record[key] = int(round(value))
-                except (ValueError, TypeError):
-                    normalized_record[key] = value
-            else:
-                normalized_record[key] = value
+        normalized_record = dict.fromkeys(all_keys)
+        normalized_record.update(record)
+        # Convert floats to integers for INTEGER columns (ints déjà bons: rien à faire)
+        for key in int_keys:
+            value = normalized_record[key]
+            if value is None or type(value) is int:
+                continue
+            try:
+                normalized_record[key] = int(round(value))
+            except (ValueError, TypeError):
+                pass
         normalized.append(normalized_record)
 
     return normalized
 
+# Au-delà, le corps JSON d'une seule RPC devient trop gros: chemin par batches
+INGEST_RPC_MAX_RECORDS = 10000
+
+# Passe à False (pour le reste du processus) si la RPC n'est pas déployée
+_ingest_rpc_available = True
+
+def ingest_activity_rpc(records: List[Dict], metadata: Dict, intervals: List[Dict] = None) -> Optional[bool]:
+    """
+    Insérer une activité complète via la RPC ingest_activity (1 requête, 1 transaction).
+
+    Metadata, records et intervals sont écrits, puis le temps en zones et la
+    monotonie/strain de la semaine sont calculés côté serveur
+    (migrations/create_ingest_activity_rpc.sql).
+
+    Returns:
+        True si tout est inséré; False si l'appelant doit utiliser le chemin
+        par batches (RPC absente ou refusée: rien n'a été écrit); None si le
+        résultat est inconnu (réponse perdue et vérification impossible):
+        l'activité n'est pas réécrite, le prochain import la reprendra
+    """
+    global _ingest_rpc_available
+    if not _ingest_rpc_available:
+        return False
+
+    payload = {
+        "p_metadata": metadata,
+        "p_records": records,
+        "p_intervals": intervals or []
+    }
+
+    body, headers = supabase_body(payload, {"Content-Type": "application/json"})
+    try:
+        response = SUPABASE_INSERT_SESSION.post(
+            f"{SUPABASE_URL}/rest/v1/rpc/ingest_activity",
+            headers=headers, data=body, timeout=120
+        )
+    except requests.exceptions.RequestException as e:
+        log(f"  ingest_activity error: {e}", "WARNING")
+        return _confirm_ingested(records, metadata, intervals)
+
+    if response.status_code == 404:
+        _ingest_rpc_available = False
+        log("  RPC ingest_activity non déployée, inserts par batches", "WARNING")
+        return False
+
+    if response.status_code >= 500:
+        # 502/504: la transaction a pu être validée avant la perte de la réponse
+        log(f"  ingest_activity error {response.status_code}: {response.text[:200]}", "WARNING")
+        return _confirm_ingested(records, metadata, intervals)
+
+    if response.status_code != 200:
+        log(f"  ingest_activity error {response.status_code}: {response.text[:200]} (fallback batches)", "WARNING")
+        return False
+
+    result = orjson.loads(response.content)
+    row = result[0] if result else {}
+    records_inserted = row.get('records_inserted', len(records))
+    intervals_inserted = row.get('intervals_inserted', len(intervals or []))
+
+    bump_stat('metadata_inserted')
+    bump_stat('records_inserted', records_inserted)
+    bump_stat('intervals_inserted', intervals_inserted)
+    log(f"  Inséré {records_inserted} records + metadata + {intervals_inserted} intervals (RPC)", "SUCCESS")
+    return True
+
+def _confirm_ingested(records: List[Dict], metadata: Dict, intervals: List[Dict] = None) -> Optional[bool]:
+    """
+    Après une réponse ingest_activity perdue: l'activité a-t-elle été validée?
+
+    La RPC est atomique, donc la ligne activity_metadata n'existe que si
+    tout a été écrit (l'activité était absente avant l'import).
+
+    Returns:
+        True si validée, False si rien n'a été écrit (fallback batches sans
+        risque de doublons), None si la vérification échoue
+    """
+    activity_id = metadata['activity_id']
+    existing = fetch_existing_activity_ids(metadata.get('athlete_id'), [activity_id])
+    if existing is None:
+        log(f"  {activity_id}: résultat inconnu, activité reprise au prochain import", "ERROR")
+        return None
+    if activity_id not in existing:
+        log(f"  {activity_id}: rien n'a été écrit (fallback batches)", "WARNING")
+        return False
+
+    bump_stat('metadata_inserted')
+    bump_stat('records_inserted', len(records))
+    bump_stat('intervals_inserted', len(intervals or []))
+    log(f"  Inséré {len(records)} records + metadata + {len(intervals or [])} intervals (RPC, confirmé)", "SUCCESS")
+    return True
+
+# Taille maximale d'un corps ingest_activities (sous la limite de requête PostgREST)
+INGEST_BATCH_MAX_BYTES = 4 * 1024 * 1024
+
+# Passe à False (pour le reste du processus) si la RPC n'est pas déployée
+_ingest_batch_rpc_available = True
+
+def _ingest_activities_chunk(chunk: List[Tuple[int, bytes]], items: List[Tuple[List[Dict], Dict, List[Dict]]],
+                             results: List[Optional[bool]]):
+    """
+    Envoyer un lot d'activités pré-sérialisées à la RPC ingest_activities.
+
+    results[idx] passe à True pour chaque activité insérée; les autres restent
+    à None (l'appelant les réessaie une par une). Si la réponse est perdue
+    (timeout, 5xx), seules les activités absentes de la base sont réessayées;
+    si la vérification échoue, aucune (results[idx] = False).
+    """
+    global _ingest_batch_rpc_available
+    if not _ingest_batch_rpc_available:
+        return
+
+    body = b'{"p_activities":[' + b','.join(part for _, part in chunk) + b']}'
+    body, headers = supabase_body(body, {"Content-Type": "application/json"})
+    try:
+        response = SUPABASE_INSERT_SESSION.post(
+            f"{SUPABASE_URL}/rest/v1/rpc/ingest_activities",
+            headers=headers, data=body, timeout=300
+        )
+    except requests.exceptions.RequestException as e:
+        log(f"  ingest_activities error: {e}", "WARNING")
+        _confirm_ingested_chunk(chunk, items, results)
+        return
+
+    if response.status_code == 404:
+        _ingest_batch_rpc_available = False
+        log("  RPC ingest_activities non déployée, inserts par activité", "WARNING")
+        return
+
+    if response.status_code >= 500:
+        # 502/504: des sous-transactions ont pu être validées
+        log(f"  ingest_activities error {response.status_code}: {response.text[:200]}", "WARNING")
+        _confirm_ingested_chunk(chunk, items, results)
+        return
+
+    if response.status_code != 200:
+        log(f"  ingest_activities error {response.status_code}: {response.text[:200]} (fallback par activité)", "WARNING")
+        return
+
+    # Une ligne par activité, dans l'ordre du lot
+    for (idx, _), row in zip(chunk, orjson.loads(response.content)):
+        if row.get('error'):
+            log(f"  {row.get('activity_id')}: {row['error'][:200]} (fallback)", "WARNING")
+            continue
+        bump_stat('metadata_inserted')
+        bump_stat('records_inserted', row.get('records_inserted') or 0)
+        bump_stat('intervals_inserted', row.get('intervals_inserted') or 0)
+        log(f"  {row.get('activity_id')}: inséré {row.get('records_inserted')} records + metadata + "
+            f"{row.get('intervals_inserted')} intervals (RPC)", "SUCCESS")
+        results[idx] = True
+
+def _confirm_ingested_chunk(chunk: List[Tuple[int, bytes]], items: List[Tuple[List[Dict], Dict, List[Dict]]],
+                            results: List[Optional[bool]]):
+    """
+    Après une réponse ingest_activities perdue: marquer les activités validées.
+
+    Chaque activité est atomique (sous-transaction), donc sa ligne
+    activity_metadata n'existe que si elle a été entièrement écrite.
+    """
+    by_athlete = {}
+    for idx, _ in chunk:
+        metadata = items[idx][1]
+        by_athlete.setdefault(metadata.get('athlete_id'), []).append(idx)
+
+    for athlete_id, indices in by_athlete.items():
+        existing = fetch_existing_activity_ids(athlete_id, [items[idx][1]['activity_id'] for idx in indices])
+        if existing is None:
+            log(f"  {len(indices)} activités au résultat inconnu, reprises au prochain import", "ERROR")
+            for idx in indices:
+                results[idx] = False
+            continue
+        for idx in indices:
+            records, metadata, intervals = items[idx]
+            if metadata['activity_id'] not in existing:
+                continue  # Rien d'écrit: fallback par activité
+            bump_stat('metadata_inserted')
+            bump_stat('records_inserted', len(records))
+            bump_stat('intervals_inserted', len(intervals or []))
+            log(f"  {metadata['activity_id']}: inséré {len(records)} records + metadata + "
+                f"{len(intervals or [])} intervals (RPC, confirmé)", "SUCCESS")
+            results[idx] = True
+
+def insert_activities_to_supabase(items: List[Tuple[List[Dict], Dict, List[Dict]]], dry_run: bool = False,
+                                  map_fn=map) -> List[bool]:
+    """
+    Insérer plusieurs activités (records, metadata, intervals) en peu de requêtes.
+
+    Les activités sont regroupées en corps d'au plus INGEST_BATCH_MAX_BYTES
+    pour la RPC ingest_activities (migrations/create_ingest_activities_rpc.sql);
+    map_fn permet d'envoyer les lots en parallèle. Les activités trop grosses,
+    en échec, ou sans RPC déployée passent par insert_to_supabase.
+
+    Returns:
+        Succès de chaque activité, dans l'ordre de items
+    """
+    results: List[Optional[bool]] = [None] * len(items)
+
+    if not dry_run and _ingest_batch_rpc_available and len(items) > 1:
+        chunks = []
+        chunk, chunk_bytes = [], 0
+        for idx, (records, metadata, intervals) in enumerate(items):
+            if len(records) > INGEST_RPC_MAX_RECORDS:
+                continue
+            part = orjson.dumps({
+                "p_metadata": metadata,
+                "p_records": normalize_records(records),
+                "p_intervals": intervals or []
+            }, option=orjson.OPT_SERIALIZE_NUMPY)
+            if len(part) > INGEST_BATCH_MAX_BYTES:
+                continue
+            if chunk and chunk_bytes + len(part) > INGEST_BATCH_MAX_BYTES:
+                chunks.append(chunk)
+                chunk, chunk_bytes = [], 0
+            chunk.append((idx, part))
+            chunk_bytes += len(part) + 1
+        if chunk:
+            chunks.append(chunk)
+
+        list(map_fn(lambda c: _ingest_activities_chunk(c, items, results), chunks))
+
+    for idx, (records, metadata, intervals) in enumerate(items):
+        if results[idx] is None:
+            results[idx] = insert_to_supabase(records, metadata, intervals, dry_run)
+    return results
+
 def insert_to_supabase(records: List[Dict], metadata: Dict, intervals: List[Dict] = None, dry_run: bool = False):
     """Insérer dans Supabase"""
     if dry_run:
@@ -1289,8 +2344,6 @@ def insert_to_supabase(records: List[Dict], metadata: Dict, intervals: List[Dict
     
     try:
         headers = {
-            "apikey": SUPABASE_KEY,
-            "Authorization": f"Bearer {SUPABASE_KEY}",
             "Content-Type": "application/json",
             "Prefer": "return=representation,resolution=merge-duplicates"
         }
@@ -1298,19 +2351,31 @@ def insert_to_supabase(records: List[Dict], metadata: Dict, intervals: List[Dict
         # Normaliser les records pour avoir les mêmes clés
         records = normalize_records(records)
         
+        # Chemin rapide: tout en une seule RPC transactionnelle
+        if len(records) <= INGEST_RPC_MAX_RECORDS:
+            ingested = ingest_activity_rpc(records, metadata, intervals)
+            if ingested is None:
+                return False  # Peut-être déjà écrite: ne pas dupliquer les records
+            if ingested:
+                return True
+        
         # Métadonnées
-        meta_url = f"{SUPABASE_URL}/rest/v1/activity_metadata"
-        meta_response = requests.post(meta_url, headers=headers, json=[metadata], timeout=30)
+        # Upsert sur activity_id (clé unique): POST rejouable sans doublon
+        meta_url = f"{SUPABASE_URL}/rest/v1/activity_metadata?on_conflict=activity_id"
+        meta_response = SUPABASE_REST_SESSION.post(
+            meta_url, headers=headers,
+            data=orjson.dumps([metadata], option=orjson.OPT_SERIALIZE_NUMPY), timeout=30
+        )
         
         if meta_response.status_code not in [200, 201]:
             try:
-                error_detail = meta_response.json()
+                error_detail = orjson.loads(meta_response.content)
                 log(f"  Metadata error {meta_response.status_code}: {error_detail}", "ERROR")
             except:
                 log(f"  Metadata error {meta_response.status_code}: {meta_response.text[:200]}", "ERROR")
             return False
         
-        stats['metadata_inserted'] += 1
+        bump_stat('metadata_inserted')
         
         # Records par batches (with retry logic)
         total_inserted = 0
@@ -1324,23 +2389,26 @@ def insert_to_supabase(records: List[Dict], metadata: Dict, intervals: List[Dict
             success, error = insert_records_batch_with_retry(records_url, headers, batch)
             if not success:
                 log(f"    Batch {batch_num}/{total_batches} FAILED after retries: {error}", "ERROR")
-                stats['batch_failures'] += 1
+                bump_stat('batch_failures')
             else:
                 total_inserted += len(batch)
 
-        stats['records_inserted'] += total_inserted
+        bump_stat('records_inserted', total_inserted)
         
         # Intervals
         if intervals:
             intervals_url = f"{SUPABASE_URL}/rest/v1/activity_intervals"
-            intervals_response = requests.post(intervals_url, headers=headers, json=intervals, timeout=30)
+            intervals_response = SUPABASE_INSERT_SESSION.post(
+                intervals_url, headers=headers,
+                data=orjson.dumps(intervals, option=orjson.OPT_SERIALIZE_NUMPY), timeout=30
+            )
             
             if intervals_response.status_code in [200, 201]:
-                stats['intervals_inserted'] += len(intervals)
+                bump_stat('intervals_inserted', len(intervals))
                 log(f"  Inséré {total_inserted} records + metadata + {len(intervals)} intervals", "SUCCESS")
             else:
                 try:
-                    error_detail = intervals_response.json()
+                    error_detail = orjson.loads(intervals_response.content)
                     log(f"  Intervals error {intervals_response.status_code}: {error_detail}", "WARNING")
                 except:
                     log(f"  Intervals error {intervals_response.status_code}: {intervals_response.text[:200]}", "WARNING")
@@ -1348,15 +2416,14 @@ def insert_to_supabase(records: List[Dict], metadata: Dict, intervals: List[Dict
         else:
             log(f"  Inséré {total_inserted} records + metadata", "SUCCESS")
 
-        # Calculate zone time for this activity (incremental calculation)
+        # Zone time + monotony/strain: marqués ici, calculés par lots en fin
+        # d'athlète (flush_pending_calculations)
         # Only for activities with GPS records (running activities)
-        if records and len(records) > 0:
-            calculate_zone_time_for_activity(metadata['activity_id'])
+        if records and 'athlete_id' in metadata:
+            mark_activity_for_zone_time(metadata['athlete_id'], metadata['activity_id'])
 
-            # Calculate monotony/strain for the affected week
-            if 'date' in metadata and 'athlete_id' in metadata:
-                week_start = get_week_start(metadata['date'])
-                calculate_monotony_strain_for_week(metadata['athlete_id'], week_start)
+            if 'date' in metadata:
+                mark_week_for_monotony(metadata['athlete_id'], get_week_start(metadata['date']))
 
         return True
         
@@ -1388,21 +2455,15 @@ def calculate_zone_time_for_activity(activity_id: str, dry_run: bool = False) ->
 
     try:
         url = f"{SUPABASE_URL}/rest/v1/rpc/calculate_zone_time_for_activity"
-        headers = {
-            "apikey": SUPABASE_KEY,
-            "Authorization": f"Bearer {SUPABASE_KEY}",
-            "Content-Type": "application/json"
-        }
 
-        response = requests.post(
+        response = SUPABASE_SESSION.post(
             url,
-            headers=headers,
-            json={"p_activity_id": activity_id},
+            data=orjson.dumps({"p_activity_id": activity_id}),
             timeout=30
         )
 
         if response.status_code in (200, 204):
-            result = response.json()
+            result = orjson.loads(response.content)
             if result and len(result) > 0:
                 was_inserted = result[0].get('was_inserted', False)
                 if was_inserted:
@@ -1419,6 +2480,57 @@ def calculate_zone_time_for_activity(activity_id: str, dry_run: bool = False) ->
         return False
 
 
+# Activity_ids par appel de calculate_zone_time_for_activities
+ZONE_TIME_BATCH_SIZE = 50
+
+# Passe à False (pour le reste du processus) si la RPC batch n'est pas déployée
+_zone_time_batch_available = True
+
+def calculate_zone_time_for_activities(activity_ids: List[str], dry_run: bool = False) -> bool:
+    """
+    Calculate zone time for several activities in one RPC call.
+
+    Uses calculate_zone_time_for_activities() (migrations/create_zone_time_batch_rpc.sql);
+    falls back to one calculate_zone_time_for_activity() call per activity
+    when the batch function is not deployed.
+
+    Returns:
+        True if every calculation succeeded, False otherwise
+    """
+    global _zone_time_batch_available
+    if not activity_ids:
+        return True
+
+    if dry_run:
+        log(f"  [DRY-RUN] Would calculate zone time for {len(activity_ids)} activities")
+        return True
+
+    if _zone_time_batch_available:
+        try:
+            response = SUPABASE_SESSION.post(
+                f"{SUPABASE_URL}/rest/v1/rpc/calculate_zone_time_for_activities",
+                data=orjson.dumps({"p_activity_ids": activity_ids}),
+                timeout=120
+            )
+            if response.status_code in (200, 204):
+                result = orjson.loads(response.content) if response.content else []
+                total_mins = sum(float(row.get('total_zone_minutes') or 0) for row in result)
+                log(f"  Zone time: {len(activity_ids)} activités, {total_mins:.1f} min", "SUCCESS")
+                return True
+            if response.status_code == 404:
+                _zone_time_batch_available = False
+                log("  RPC calculate_zone_time_for_activities non déployée, calcul par activité", "WARNING")
+            else:
+                log(f"  Zone time batch failed: {response.status_code} (fallback par activité)", "WARNING")
+        except Exception as e:
+            log(f"  Zone time batch error: {e} (fallback par activité)", "WARNING")
+
+    ok = True
+    for activity_id in activity_ids:
+        ok = calculate_zone_time_for_activity(activity_id) and ok
+    return ok
+
+
 def calculate_monotony_strain_for_week(athlete_id: str, week_start: date, dry_run: bool = False) -> bool:
     """
     Calculate and store weekly monotony/strain via SQL function.
@@ -1442,24 +2554,18 @@ def calculate_monotony_strain_for_week(athlete_id: str, week_start: date, dry_ru
 
     try:
         url = f"{SUPABASE_URL}/rest/v1/rpc/calculate_monotony_strain_for_week"
-        headers = {
-            "apikey": SUPABASE_KEY,
-            "Authorization": f"Bearer {SUPABASE_KEY}",
-            "Content-Type": "application/json"
-        }
 
-        response = requests.post(
+        response = SUPABASE_SESSION.post(
             url,
-            headers=headers,
-            json={
+            data=orjson.dumps({
                 "p_athlete_id": athlete_id,
                 "p_week_start": week_start.isoformat()
-            },
+            }),
             timeout=30
         )
 
         if response.status_code in (200, 204):
-            result = response.json()
+            result = orjson.loads(response.content)
             if result and len(result) > 0:
                 total_strain = result[0].get('total_strain', 0)
                 total_monotony = result[0].get('total_monotony', 0)
@@ -1475,6 +2581,7 @@ def calculate_monotony_strain_for_week(athlete_id: str, week_start: date, dry_ru
         return False
 
 
+@functools.lru_cache(maxsize=4096)
 def get_week_start(activity_date_str: str) -> date:
     """
     Get the Monday (week start) for a given activity date.
@@ -1492,8 +2599,118 @@ def get_week_start(activity_date_str: str) -> date:
     return week_start
 
 
-def process_activity(athlete: Dict, activity: Dict, dry_run: bool = False, skip_weather: bool = False):
-    """Traiter une activité avec stratégie hybride"""
+# Calculs post-insert en attente, par athlète:
+# - activités (athlete_id, activity_id) dont le temps en zones reste à calculer
+# - semaines (athlete_id, lundi) dont monotony/strain reste à calculer
+# Un import de 200 activités dans la même semaine ne fait ainsi que 4 appels
+# zone time + 1 appel monotony, après la dernière activité (résultat complet).
+_pending_zone_time = {}
+_pending_monotony_weeks = set()
+_pending_calc_lock = threading.Lock()
+
+def mark_activity_for_zone_time(athlete_id: str, activity_id: str):
+    """Marquer une activité pour le calcul du temps en zones (thread-safe)"""
+    with _pending_calc_lock:
+        _pending_zone_time.setdefault((athlete_id, activity_id), None)
+
+def mark_week_for_monotony(athlete_id: str, week_start: date):
+    """Marquer une semaine à recalculer (thread-safe, voir flush_pending_calculations)"""
+    with _pending_calc_lock:
+        _pending_monotony_weeks.add((athlete_id, week_start))
+
+def flush_pending_calculations(athlete_id: str, dry_run: bool = False):
+    """
+    Lancer les calculs en attente pour cet athlète: temps en zones par lots
+    de ZONE_TIME_BATCH_SIZE, puis monotony/strain une fois par semaine
+    (monotony/strain lit activity_zone_time: l'ordre compte).
+    """
+    with _pending_calc_lock:
+        activity_ids = [activity for athlete, activity in _pending_zone_time if athlete == athlete_id]
+        for activity_id in activity_ids:
+            del _pending_zone_time[(athlete_id, activity_id)]
+        weeks = sorted(week for athlete, week in _pending_monotony_weeks if athlete == athlete_id)
+        _pending_monotony_weeks.difference_update((athlete_id, week) for week in weeks)
+
+    for i in range(0, len(activity_ids), ZONE_TIME_BATCH_SIZE):
+        calculate_zone_time_for_activities(activity_ids[i:i + ZONE_TIME_BATCH_SIZE], dry_run)
+
+    for week_start in weeks:
+        calculate_monotony_strain_for_week(athlete_id, week_start, dry_run)
+
+
+def add_weather_to_metadata(metadata: Dict, lat: float, lng: float, start_time: str,
+                            prefetched: Optional[Tuple[Optional[tuple], Optional[dict]]] = None):
+    """
+    Ajouter météo + qualité de l'air aux métadonnées (Phase 1: Best Effort).
+
+    prefetched vient de prefetch_weather(); ce qui y manque (archive sans
+    données, requête groupée en échec) passe par le chemin par activité.
+    """
+    weather_result, air = prefetched or (None, None)
+    if weather_result is None and air is None:
+        log(f"  → Fetching weather (archive/forecast)...")
+        weather, weather_source, weather_error, air = fetch_weather_and_air_quality(lat, lng, start_time)
+    else:
+        if weather_result is None:
+            log(f"  → Fetching weather (archive/forecast)...")
+            weather_result = get_weather_best_effort(lat, lng, start_time)
+        if air is None:
+            air = fetch_air_quality_archive(lat, lng, start_time)
+        weather, weather_source, weather_error = weather_result
+
+    # Add weather source tracking
+    metadata['weather_source'] = weather_source  # 'archive', 'forecast', or NULL
+
+    if weather:
+        # Weather available - add all fields
+        apply_fields(metadata, weather, WEATHER_FIELD_MAP)
+
+        # Track weather success
+        bump_stat('weather_complete')
+        if weather_source == 'archive':
+            bump_stat('weather_from_archive')
+        elif weather_source == 'forecast':
+            bump_stat('weather_from_forecast')
+            log(f"   Using forecast weather (archive unavailable)", "WARNING")
+    else:
+        # Weather completely unavailable - flag but CONTINUE
+        metadata['weather_error'] = weather_error
+        log(f"  Weather unavailable: {weather_error}", "ERROR")
+        bump_stat('weather_missing')
+
+    # Ajouter les données de qualité de l'air
+    apply_fields(metadata, air, AIR_FIELD_MAP)
+
+
+def add_activity_weather(prepared: Dict, skip_weather: bool = False, weather_prefetch: Optional[Dict] = None):
+    """Ajouter la météo aux métadonnées d'une activité préparée (si position disponible)"""
+    # Skip weather if --skip-weather flag is set (bulk import optimization)
+    if prepared['weather_point']:
+        if skip_weather:
+            log(f"  → Skipping weather (--skip-weather flag)")
+        else:
+            metadata = prepared['metadata']
+            prefetched = (weather_prefetch or {}).get(metadata['activity_id'])
+            add_weather_to_metadata(metadata, *prepared['weather_point'], prefetched=prefetched)
+
+
+def _iso_start(activity_date: str) -> Optional[str]:
+    """Date d'activité (YYYY-MM-DD) -> start_time ISO approximatif, None si invalide"""
+    try:
+        return datetime.fromisoformat(activity_date).isoformat()
+    except (TypeError, ValueError):
+        return None
+
+
+def prepare_activity(athlete: Dict, activity: Dict, dry_run: bool = False) -> Union[Dict, bool]:
+    """
+    Télécharger/parser une activité (FIT, sinon streams) et ses intervals.
+
+    Returns:
+        Dict pour add_activity_weather puis insert_activities_to_supabase
+        (records, metadata, intervals, weather_point), ou directement le résultat (bool) quand l'activité
+        est déjà terminée: cross-training (métadonnées insérées) ou échec.
+    """
     activity_id = activity.get('id')
     activity_type = activity.get('type')
     activity_date = activity.get('start_date_local', '')[:10]
@@ -1536,16 +2753,20 @@ def process_activity(athlete: Dict, activity: Dict, dry_run: bool = False, skip_
         # Insert metadata only (no records, no intervals)
         success = insert_to_supabase([], metadata, None, dry_run)
         if success:
-            stats['activities_processed'] += 1
+            bump_stat('activities_processed')
             log(f"  Cross-training metadata imported successfully", "SUCCESS")
         return success
 
     # For running activities, continue with full processing
+    # Intervals demandés tout de suite: la requête est indépendante du FIT /
+    # des streams et se fait pendant leur téléchargement
+    intervals_future = INTERVALS_EXECUTOR.submit(get_intervals, athlete, activity_id)
+
     # Essayer FIT d'abord
     records, metadata, fit_success = download_and_parse_fit(athlete, activity_id, athlete['id'])
     
     if fit_success and records:
-        stats['fit_success'] += 1
+        bump_stat('fit_success')
         # Compléter métadonnées
         metadata.update({
             'type': activity_type,
@@ -1553,93 +2774,30 @@ def process_activity(athlete: Dict, activity: Dict, dry_run: bool = False, skip_
             'athlete_id': athlete['id']
         })
         
-        # Enrichir avec météo si position disponible (Phase 1: Best Effort)
-        # Skip weather if --skip-weather flag is set (bulk import optimization)
+        # Position de départ pour la météo (ajoutée par add_activity_weather)
+        weather_point = None
         if metadata.get('start_lat') and metadata.get('start_lon') and metadata.get('start_time'):
-            stats['outdoor_activities'] += 1
-
-            if skip_weather:
-                log(f"  → Skipping weather (--skip-weather flag)")
-            else:
-                log(f"  → Fetching weather (archive/forecast)...")
-                weather, weather_source, weather_error = get_weather_best_effort(
-                    metadata['start_lat'], metadata['start_lon'], metadata['start_time']
-                )
-                air = fetch_air_quality_archive(metadata['start_lat'], metadata['start_lon'], metadata['start_time'])
-
-                # Add weather source tracking
-                metadata['weather_source'] = weather_source  # 'archive', 'forecast', or NULL
-
-                if weather:
-                    # Weather available - add all fields
-                    if weather.get('temperature_2m') is not None:
-                        metadata['weather_temp_c'] = weather['temperature_2m']
-                    if weather.get('relative_humidity_2m') is not None:
-                        metadata['weather_humidity_pct'] = int(weather['relative_humidity_2m'])
-                    if weather.get('dew_point_2m') is not None:
-                        metadata['weather_dew_point_c'] = weather['dew_point_2m']
-                    if weather.get('wind_speed_10m') is not None:
-                        metadata['weather_wind_speed_ms'] = weather['wind_speed_10m']
-                    if weather.get('wind_gusts_10m') is not None:
-                        metadata['weather_wind_gust_ms'] = weather['wind_gusts_10m']
-                    if weather.get('wind_direction_10m') is not None:
-                        metadata['weather_wind_dir_deg'] = int(weather['wind_direction_10m'])
-                    if weather.get('pressure_msl') is not None:
-                        metadata['weather_pressure_hpa'] = weather['pressure_msl']
-                    if weather.get('cloudcover') is not None:
-                        metadata['weather_cloudcover_pct'] = int(weather['cloudcover'])
-                    if weather.get('precipitation') is not None:
-                        metadata['weather_precip_mm'] = weather['precipitation']
-
-                    # Track weather success
-                    stats['weather_complete'] += 1
-                    if weather_source == 'archive':
-                        stats['weather_from_archive'] += 1
-                    elif weather_source == 'forecast':
-                        stats['weather_from_forecast'] += 1
-                        log(f"   Using forecast weather (archive unavailable)", "WARNING")
-                else:
-                    # Weather completely unavailable - flag but CONTINUE
-                    metadata['weather_error'] = weather_error
-                    log(f"  Weather unavailable: {weather_error}", "ERROR")
-                    stats['weather_missing'] += 1
-
-                # Ajouter les données de qualité de l'air
-                if air.get('pm2_5') is not None:
-                    metadata['air_pm2_5'] = air['pm2_5']
-                if air.get('pm10') is not None:
-                    metadata['air_pm10'] = air['pm10']
-                if air.get('ozone') is not None:
-                    metadata['air_ozone'] = air['ozone']
-                if air.get('nitrogen_dioxide') is not None:
-                    metadata['air_no2'] = air['nitrogen_dioxide']
-                if air.get('sulphur_dioxide') is not None:
-                    metadata['air_so2'] = air['sulphur_dioxide']
-                if air.get('carbon_monoxide') is not None:
-                    metadata['air_co'] = air['carbon_monoxide']
-                if air.get('us_aqi') is not None:
-                    metadata['air_us_aqi'] = int(air['us_aqi'])
+            bump_stat('outdoor_activities')
+            weather_point = (metadata['start_lat'], metadata['start_lon'], metadata['start_time'])
         
         # Récupérer les intervals
-        intervals = get_intervals(athlete, activity_id)
+        intervals = intervals_future.result()
         if intervals:
             log(f"  {len(intervals)} intervals récupérés")
             # Enrichir avec temps actif pour affichage dashboard
             intervals = enrich_intervals_with_active_time(intervals, records)
         
-        success = insert_to_supabase(records, metadata, intervals, dry_run)
-        if success:
-            stats['activities_processed'] += 1
-        return success
+        return {'records': records, 'metadata': metadata, 'intervals': intervals, 'weather_point': weather_point}
     
     # Fallback sur streams
     log(f"  → Fallback sur streams", "WARNING")
-    stats['stream_fallback'] += 1
+    bump_stat('stream_fallback')
     
     streams = get_streams(athlete, activity_id)
     if not streams:
         log(f"  Streams non disponibles", "ERROR")
-        stats['fit_failed'] += 1
+        bump_stat('fit_failed')
+        _discard_future(intervals_future)
         return False
     
     log(f"  Streams récupérés")
@@ -1650,6 +2808,7 @@ def process_activity(athlete: Dict, activity: Dict, dry_run: bool = False, skip_
     records = parse_streams_to_records(streams, activity_id, activity_type)
     if not records:
         log(f"  Aucun record extrait des streams", "ERROR")
+        _discard_future(intervals_future)
         return False
     
     log(f"  Streams parsés: {len(records)} records")
@@ -1678,99 +2837,37 @@ def process_activity(athlete: Dict, activity: Dict, dry_run: bool = False, skip_
     if avg_hr is not None:
         metadata['avg_hr'] = int(avg_hr)
     
-    # Extraire position de départ des records pour météo
-    start_lat, start_lon, start_time = None, None, None
-    for rec in records:
-        if 'lat' in rec and 'lng' in rec:
-            start_lat = rec['lat']
-            start_lon = rec['lng']
-            break
+    # Extraire position de départ pour météo: premier point GPS valide,
+    # lu directement dans le stream latlng (sinon dans les records)
+    start_lat, start_lon = first_stream_latlng(streams, len(records))
+    if start_lat is None:
+        first_gps = next((rec for rec in records if 'lat' in rec and 'lng' in rec), None)
+        if first_gps:
+            start_lat, start_lon = first_gps['lat'], first_gps['lng']
+    start_time = None
     if records and 'time' in records[0]:
         # Construire start_time approximatif
-        from datetime import datetime, timedelta
-        try:
-            activity_datetime = datetime.fromisoformat(activity_date)
-            start_time = activity_datetime.isoformat()
-        except:
-            pass
+        start_time = _iso_start(activity_date)
     
-    # Enrichir avec météo si position disponible (Phase 1: Best Effort)
-    # Skip weather if --skip-weather flag is set (bulk import optimization)
+    # Position de départ pour la météo (ajoutée par add_activity_weather)
+    weather_point = None
     if start_lat and start_lon and start_time:
         # Always add GPS coordinates
         metadata['start_lat'] = start_lat
         metadata['start_lon'] = start_lon
-        stats['outdoor_activities'] += 1
-
-        if skip_weather:
-            log(f"  → Skipping weather (--skip-weather flag)")
-        else:
-            log(f"  → Fetching weather (archive/forecast)...")
-            weather, weather_source, weather_error = get_weather_best_effort(
-                start_lat, start_lon, start_time
-            )
-            air = fetch_air_quality_archive(start_lat, start_lon, start_time)
-
-            # Add weather source tracking
-            metadata['weather_source'] = weather_source  # 'archive', 'forecast', or NULL
-
-            if weather:
-                # Weather available - add all fields
-                if weather.get('temperature_2m') is not None:
-                    metadata['weather_temp_c'] = weather['temperature_2m']
-                if weather.get('relative_humidity_2m') is not None:
-                    metadata['weather_humidity_pct'] = int(weather['relative_humidity_2m'])
-                if weather.get('dew_point_2m') is not None:
-                    metadata['weather_dew_point_c'] = weather['dew_point_2m']
-                if weather.get('wind_speed_10m') is not None:
-                    metadata['weather_wind_speed_ms'] = weather['wind_speed_10m']
-                if weather.get('wind_gusts_10m') is not None:
-                    metadata['weather_wind_gust_ms'] = weather['wind_gusts_10m']
-                if weather.get('wind_direction_10m') is not None:
-                    metadata['weather_wind_dir_deg'] = int(weather['wind_direction_10m'])
-                if weather.get('pressure_msl') is not None:
-                    metadata['weather_pressure_hpa'] = weather['pressure_msl']
-                if weather.get('cloudcover') is not None:
-                    metadata['weather_cloudcover_pct'] = int(weather['cloudcover'])
-                if weather.get('precipitation') is not None:
-                    metadata['weather_precip_mm'] = weather['precipitation']
-
-                # Track weather success
-                stats['weather_complete'] += 1
-                if weather_source == 'archive':
-                    stats['weather_from_archive'] += 1
-                elif weather_source == 'forecast':
-                    stats['weather_from_forecast'] += 1
-                    log(f"   Using forecast weather (archive unavailable)", "WARNING")
-            else:
-                # Weather completely unavailable - flag but CONTINUE
-                metadata['weather_error'] = weather_error
-                log(f"  Weather unavailable: {weather_error}", "ERROR")
-                stats['weather_missing'] += 1
-
-            # Ajouter les données de qualité de l'air
-            if air.get('pm2_5') is not None:
-                metadata['air_pm2_5'] = air['pm2_5']
-            if air.get('pm10') is not None:
-                metadata['air_pm10'] = air['pm10']
-            if air.get('ozone') is not None:
-                metadata['air_ozone'] = air['ozone']
-            if air.get('nitrogen_dioxide') is not None:
-                metadata['air_no2'] = air['nitrogen_dioxide']
-            if air.get('sulphur_dioxide') is not None:
-                metadata['air_so2'] = air['sulphur_dioxide']
-            if air.get('carbon_monoxide') is not None:
-                metadata['air_co'] = air['carbon_monoxide']
-            if air.get('us_aqi') is not None:
-                metadata['air_us_aqi'] = int(air['us_aqi'])
+        bump_stat('outdoor_activities')
+        weather_point = (start_lat, start_lon, start_time)
     
     # Phase 1: Enhanced HR fallback for streams path
-    # Check if we have HR data in records to track HR monitor usage
-    hr_in_records = any(rec.get('heartrate') for rec in records)
+    # Check if we have HR data to track HR monitor usage, on the heartrate
+    # stream directly (tronqué en int dans les records: non nul ssi |hr| >= 1)
+    hr_stream = streams.get('heartrate')
+    hr_in_records = hr_stream is not None and bool(np.any(np.abs(hr_stream[:len(records)]) >= 1))
     if hr_in_records:
-        stats['hr_monitor_used'] += 1
+        bump_stat('hr_monitor_used')
         
-    # Use enhanced HR fallback with streams data
+    # Use enhanced HR fallback with streams data (retourne tout de suite
+    # l'avg_hr d'Intervals.icu s'il est présent: aucun parcours des records)
     enhanced_avg_hr = get_avg_hr_with_fallback(metadata, streams, records)
     if enhanced_avg_hr:
         metadata['avg_hr'] = enhanced_avg_hr
@@ -1778,20 +2875,28 @@ def process_activity(athlete: Dict, activity: Dict, dry_run: bool = False, skip_
         log(f"   No HR data available", "WARNING")
     
     # Récupérer les intervals
-    intervals = get_intervals(athlete, activity_id)
+    intervals = intervals_future.result()
     if intervals:
         log(f"  {len(intervals)} intervals récupérés")
         # Enrichir avec temps actif pour affichage dashboard
         intervals = enrich_intervals_with_active_time(intervals, records)
     
-    success = insert_to_supabase(records, metadata, intervals, dry_run)
-    if success:
-        stats['activities_processed'] += 1
-    
-    return success
+    return {'records': records, 'metadata': metadata, 'intervals': intervals, 'weather_point': weather_point}
+
+
+def process_athlete(athlete: Dict, oldest: str, newest: str, dry_run: bool = False, skip_weather: bool = False,
+                    activity_workers: int = 1):
+    """
+    Traiter un athlète
 
-def process_athlete(athlete: Dict, oldest: str, newest: str, dry_run: bool = False, skip_weather: bool = False):
-    """Traiter un athlète"""
+    Avec activity_workers > 1, les activités sont traitées dans un pool de
+    threads: le pipeline (téléchargement FIT, météo, inserts Supabase) est
+    dominé par l'attente réseau, donc les activités se recouvrent.
+
+    Les activités avancent par fenêtres de WEATHER_BATCH_SIZE pour que la
+    météo de toute la fenêtre tienne en une requête Open-Meteo groupée, et
+    que ses inserts partent en quelques appels ingest_activities.
+    """
     name = athlete['name']
     athlete_id = athlete['id']
 
@@ -1805,105 +2910,216 @@ def process_athlete(athlete: Dict, oldest: str, newest: str, dry_run: bool = Fal
         log(f"Aucune activité de course trouvée", "WARNING")
         return
 
-    stats['activities_found'] += len(activities)
+    bump_stat('activities_found', len(activities))
     log(f"{len(activities)} activités trouvées", "SUCCESS")
 
-    # Fetch existing activity_ids to prevent duplicates
-    existing_ids = get_existing_activity_ids(athlete_id)
+    # Fetch existing activity_ids to prevent duplicates, and drop them before
+    # any other work so the [i/n] counter only covers activities to import
+    existing_ids = get_existing_activity_ids(athlete_id, [str(a.get('id')) for a in activities if a.get('id')])
     if existing_ids:
-        log(f"  {len(existing_ids)} activités déjà importées (seront ignorées)")
+        found = len(activities)
+        activities = [a for a in activities if str(a.get('id')) not in existing_ids]
+        skipped = found - len(activities)
+        bump_stat('activities_skipped', skipped)
+        log(f"  {skipped} activités déjà importées, ignorées")
+
+    to_process = list(enumerate(activities, 1))
+
+    executor = None
+    if activity_workers > 1 and len(to_process) > 1:
+        executor = ThreadPoolExecutor(max_workers=activity_workers)
+    run_all = executor.map if executor else map
+
+    def _prepare(item):
+        i, activity = item
+        # En parallèle seulement: en série les lignes se suivent déjà
+        _log_context.activity_id = activity.get('id') if executor else None
+        try:
+            log(f"\n[{i}/{len(activities)}]")
+            return prepare_activity(athlete, activity, dry_run)
+        finally:
+            _log_context.activity_id = None
+
+    try:
+        # Par fenêtres: préparer (FIT/streams), une requête météo groupée,
+        # météo par activité, puis insertion groupée
+        for start in range(0, len(to_process), WEATHER_BATCH_SIZE):
+            window = to_process[start:start + WEATHER_BATCH_SIZE]
+            prepared = [p for p in run_all(_prepare, window) if isinstance(p, dict)]
+
+            weather_prefetch = {}
+            points = [(p['metadata']['activity_id'], *p['weather_point']) for p in prepared if p['weather_point']]
+            if points and not skip_weather:
+                weather_prefetch = prefetch_weather(points)
+
+            def _weather(p):
+                activity_id = p['metadata']['activity_id']
+                log(f"  {activity_id}: météo")
+                _log_context.activity_id = activity_id if executor else None
+                try:
+                    add_activity_weather(p, skip_weather, weather_prefetch)
+                finally:
+                    _log_context.activity_id = None
 
-    for i, activity in enumerate(activities, 1):
-        activity_id = activity.get('id')
+            list(run_all(_weather, prepared))
+
+            items = [(p['records'], p['metadata'], p['intervals']) for p in prepared]
+            inserted = insert_activities_to_supabase(items, dry_run, map_fn=run_all)
+            bump_stat('activities_processed', sum(inserted))
+    finally:
+        if executor:
+            executor.shutdown()
+        # Zone time par lots, puis une seule RPC monotony/strain par semaine touchée
+        flush_pending_calculations(athlete_id, dry_run)
+
+    bump_stat('athletes_processed')
+
+def _init_athlete_worker(quiet: bool, weather_cache_path: Optional[str] = None):
+    """Initialiser un worker (les flags de main() ne sont pas hérités en spawn)"""
+    global QUIET, WEATHER_CACHE_PATH
+    QUIET = quiet
+    WEATHER_CACHE_PATH = weather_cache_path
+
+
+def _process_athlete_in_worker(athlete: Dict, oldest: str, newest: str, dry_run: bool, skip_weather: bool,
+                               activity_workers: int) -> dict:
+    """Traiter un athlète dans un worker et renvoyer ses statistiques"""
+    _reset_stats()
+    process_athlete(athlete, oldest, newest, dry_run, skip_weather, activity_workers)
+    flush_log()  # Le worker peut être arrêté sans passer par atexit
+    return stats
 
-        # Skip if already imported (duplicate prevention)
-        if activity_id in existing_ids:
-            log(f"\n[{i}/{len(activities)}] {activity_id} → déjà importé, ignoré")
-            stats['activities_skipped'] += 1
-            continue
 
-        log(f"\n[{i}/{len(activities)}]")
-        process_activity(athlete, activity, dry_run, skip_weather)
+def process_athletes_parallel(athletes: List[Dict], oldest: str, newest: str, dry_run: bool,
+                              skip_weather: bool, workers: int, activity_workers: int = 1):
+    """
+    Traiter plusieurs athlètes en parallèle dans un seul pool de processus.
 
-    stats['athletes_processed'] += 1
+    Remplace le fan-out shell (`&` + `wait`): un pool borné, et les
+    statistiques de chaque athlète sont fusionnées pour le résumé final.
+    Les workers sont lancés en 'spawn' (pas de fork d'un processus qui a
+    déjà des threads actifs, p. ex. l'import wellness).
+    """
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_athlete_worker,
+        initargs=(QUIET, WEATHER_CACHE_PATH)
+    ) as executor:
+        futures = [
+            executor.submit(_process_athlete_in_worker, athlete, oldest, newest, dry_run, skip_weather,
+                            activity_workers)
+            for athlete in athletes
+        ]
+        for athlete, future in zip(athletes, futures):
+            try:
+                _merge_stats(future.result())
+            except Exception as e:
+                log(f"{athlete['name']}: worker error: {e}", "ERROR")
+                stats['errors'].append(f"{athlete['name']}: {e}")
 
 # =============================================================================
 # WELLNESS INTEGRATION (merged from intervals_wellness_to_supabase.py)
 # =============================================================================
 
-def transform_wellness_record(raw_record: Dict, athlete_id: str) -> Dict:
+# Requêtes wellness simultanées vers Intervals.icu (borne le pool de threads)
+WELLNESS_WORKERS = int(os.environ.get("WELLNESS_WORKERS", "8"))
+# Records wellness par upsert Supabase (une ligne par jour: ~1000 jours
+# restent loin de la limite de taille de requête)
+WELLNESS_INSERT_BATCH = 1000
+
+def _body_fat_pct(value):
+    """bodyFat Intervals.icu (fraction) -> pourcentage"""
+    return float(value * 100) if isinstance(value, (int, float)) else value
+
+# Field mapping (camelCase → snake_case), according to the wellness table schema
+WELLNESS_FIELD_MAP = {
+    'restingHR': 'resting_hr',
+    'avgSleepingHR': 'sleeping_hr',
+    'hrv': 'hrv_rmssd',
+    'hrvSDNN': 'hrv_sdnn',
+    'sleepSecs': 'sleep_seconds',
+    'sleepScore': 'sleep_score',
+    'sleepQuality': 'sleep_quality',
+    'spO2': 'spo2',
+    'systolic': 'blood_pressure_systolic',
+    'diastolic': 'blood_pressure_diastolic',
+    'soreness': 'soreness',
+    'fatigue': 'fatigue',
+    'stress': 'stress',
+    'mood': 'mood',
+    'motivation': 'motivation',
+    'injury': 'injury',
+    'weight': 'weight_kg',
+    'bodyFat': 'body_fat_pct',
+    'muscleMass': 'muscle_mass_kg',
+    'hydration': 'hydration',
+    'nutrition': 'nutrition',
+    'temperature': 'temperature_c',
+    'menstruation': 'menstruation',
+    'supplements': 'supplements',
+    'notes': 'notes'
+}
+
+# Conversions par champ (les autres valeurs sont copiées telles quelles)
+WELLNESS_CASTS = {
+    'sleepSecs': int,
+    'bodyFat': _body_fat_pct,
+}
+
+def transform_wellness_record(raw_record: Dict, athlete_id: str, created_at: Optional[str] = None) -> Dict:
     """
     Transform wellness record from Intervals.icu to Supabase format.
     Maps camelCase → snake_case according to wellness table schema.
+
+    created_at can be computed once by the caller for a whole batch.
     """
     transformed = {
         'athlete_id': athlete_id,
         'date': raw_record.get('id'),  # 'id' is the date in YYYY-MM-DD format
         'source': 'intervals.icu',
-        'created_at': datetime.now().isoformat()
+        'created_at': created_at or datetime.now().isoformat()
     }
 
-    # Field mapping (camelCase → snake_case)
-    field_mapping = {
-        'restingHR': 'resting_hr',
-        'avgSleepingHR': 'sleeping_hr',
-        'hrv': 'hrv_rmssd',
-        'hrvSDNN': 'hrv_sdnn',
-        'sleepSecs': 'sleep_seconds',
-        'sleepScore': 'sleep_score',
-        'sleepQuality': 'sleep_quality',
-        'spO2': 'spo2',
-        'systolic': 'blood_pressure_systolic',
-        'diastolic': 'blood_pressure_diastolic',
-        'soreness': 'soreness',
-        'fatigue': 'fatigue',
-        'stress': 'stress',
-        'mood': 'mood',
-        'motivation': 'motivation',
-        'injury': 'injury',
-        'weight': 'weight_kg',
-        'bodyFat': 'body_fat_pct',
-        'muscleMass': 'muscle_mass_kg',
-        'hydration': 'hydration',
-        'nutrition': 'nutrition',
-        'temperature': 'temperature_c',
-        'menstruation': 'menstruation',
-        'supplements': 'supplements',
-        'notes': 'notes'
-    }
-
-    for intervals_field, supabase_field in field_mapping.items():
-        if intervals_field in raw_record:
-            value = raw_record[intervals_field]
-            if value is not None:
-                if intervals_field == 'sleepSecs':
-                    transformed[supabase_field] = int(value)
-                elif intervals_field == 'bodyFat':
-                    transformed[supabase_field] = float(value * 100) if isinstance(value, (int, float)) else value
-                else:
-                    transformed[supabase_field] = value
+    # One pass over the (usually sparse) payload instead of 25 lookups
+    for intervals_field, value in raw_record.items():
+        supabase_field = WELLNESS_FIELD_MAP.get(intervals_field)
+        if supabase_field is None or value is None:
+            continue
+        cast = WELLNESS_CASTS.get(intervals_field)
+        transformed[supabase_field] = cast(value) if cast else value
 
     return transformed
 
 
 def get_wellness_data(athlete: Dict, target_date: str) -> Optional[List[Dict]]:
     """Fetch wellness data for a specific date from Intervals.icu."""
+    return get_wellness_range(athlete, target_date, target_date)
+
+
+def get_wellness_range(athlete: Dict, oldest: str, newest: str, timeout: int = 30) -> Optional[List[Dict]]:
+    """
+    Fetch wellness data for a date range from Intervals.icu in one request.
+
+    Returns one record per day with data ('id' is the date), [] on 404,
+    None on error.
+    """
     athlete_id = athlete['id']
     api_key = athlete['api_key']
 
     try:
         url = f"{BASE_URL}/athlete/{athlete_id}/wellness"
-        params = {"oldest": target_date, "newest": target_date}
+        params = {"oldest": oldest, "newest": newest}
 
-        response = requests.get(
+        response = HTTP_SESSION.get(
             url,
-            auth=HTTPBasicAuth("API_KEY", api_key),
+            auth=intervals_auth(api_key),
             params=params,
-            timeout=30
+            timeout=timeout
         )
 
         if response.status_code == 200:
-            return response.json()
+            return orjson.loads(response.content)
         elif response.status_code == 404:
             return []
         else:
@@ -1926,19 +3142,26 @@ def insert_wellness_to_supabase(records: List[Dict], dry_run: bool = False) -> b
         # Use Supabase REST API for upsert
         url = f"{SUPABASE_URL}/rest/v1/wellness"
         headers = {
-            "apikey": SUPABASE_KEY,
-            "Authorization": f"Bearer {SUPABASE_KEY}",
             "Content-Type": "application/json",
-            "Prefer": "resolution=merge-duplicates"  # UPSERT behavior
+            "Prefer": "resolution=merge-duplicates,return=minimal"  # UPSERT, no response body
         }
 
-        response = requests.post(url, headers=headers, json=records, timeout=30)
-
-        if response.status_code in (200, 201):
-            return True
-        else:
-            log(f"  Wellness upsert error: {response.status_code} - {response.text[:100]}", "ERROR")
-            return False
+        # PostgREST exige les mêmes clés dans tout le lot: un POST par jeu de
+        # clés (sans compléter par des null, qui écraseraient l'existant)
+        groups = {}
+        for record in records:
+            groups.setdefault(tuple(sorted(record)), []).append(record)
+
+        ok = True
+        for group in groups.values():
+            response = SUPABASE_REST_SESSION.post(
+                url, headers=headers,
+                data=orjson.dumps(group, option=orjson.OPT_SERIALIZE_NUMPY), timeout=30
+            )
+            if response.status_code not in (200, 201):
+                log(f"  Wellness upsert error: {response.status_code} - {response.text[:100]}", "ERROR")
+                ok = False
+        return ok
     except Exception as e:
         log(f"  Wellness insert error: {e}", "ERROR")
         return False
@@ -1957,11 +3180,15 @@ def import_wellness_for_date(athletes: List[Dict], target_date: str, dry_run: bo
     wellness_count = 0
     wellness_success = 0
 
-    for athlete in athletes:
-        wellness_data = get_wellness_data(athlete, target_date)
+    # Les requêtes (une par athlète) partent en parallèle; les inserts et
+    # les logs restent dans l'ordre des athlètes
+    with ThreadPoolExecutor(max_workers=max(1, min(WELLNESS_WORKERS, len(athletes)))) as executor:
+        results = list(executor.map(lambda a: get_wellness_data(a, target_date), athletes))
 
+    created_at = datetime.now().isoformat()
+    for athlete, wellness_data in zip(athletes, results):
         if wellness_data:
-            records = [transform_wellness_record(r, athlete['id']) for r in wellness_data]
+            records = [transform_wellness_record(r, athlete['id'], created_at) for r in wellness_data]
             if insert_wellness_to_supabase(records, dry_run):
                 wellness_count += len(records)
                 wellness_success += 1
@@ -1989,9 +3216,9 @@ def import_wellness_date_range(athletes: List[Dict], oldest_date: str, newest_da
         dry_run: If True, don't actually insert
 
     Uses UPSERT - safe to run multiple times (idempotent).
+    One range request per athlete (the /wellness endpoint takes oldest/newest),
+    athletes in parallel; records are upserted by WELLNESS_INSERT_BATCH.
     """
-    from datetime import timedelta
-
     log(f"\n{Colors.CYAN}{'='*70}{Colors.END}")
     log(f"{Colors.CYAN}{Colors.BOLD}HISTORICAL WELLNESS IMPORT: {oldest_date} → {newest_date}{Colors.END}")
     log(f"{Colors.CYAN}{'='*70}{Colors.END}")
@@ -2001,33 +3228,33 @@ def import_wellness_date_range(athletes: List[Dict], oldest_date: str, newest_da
 
     total_days = (end - start).days + 1
     total_records = 0
-    days_with_data = 0
+    dates_with_data = set()
 
-    current = start
-    day_num = 0
-    while current <= end:
-        day_num += 1
-        date_str = current.strftime("%Y-%m-%d")
+    # Plage complète: réponse plus lourde qu'un seul jour, timeout plus long
+    def _fetch(athlete):
+        return get_wellness_range(athlete, oldest_date, newest_date, timeout=120)
 
-        # Progress indicator every 30 days
-        if day_num % 30 == 1 or day_num == total_days:
-            log(f"\n  Processing day {day_num}/{total_days}: {date_str}")
+    with ThreadPoolExecutor(max_workers=max(1, min(WELLNESS_WORKERS, len(athletes)))) as executor:
+        for athlete, wellness_data in zip(athletes, executor.map(_fetch, athletes)):
+            if wellness_data is None:
+                log(f"  ✗ {athlete['name']}: wellness fetch failed", "ERROR")
+                continue
 
-        day_records = 0
-        for athlete in athletes:
-            wellness_data = get_wellness_data(athlete, date_str)
-            if wellness_data:
-                records = [transform_wellness_record(r, athlete['id']) for r in wellness_data]
-                if insert_wellness_to_supabase(records, dry_run):
-                    day_records += len(records)
+            days = {r.get('id') for r in wellness_data if r.get('id')}
+            log(f"\n  {athlete['name']}: {len(days)}/{total_days} days with wellness data")
 
-        if day_records > 0:
-            days_with_data += 1
-            total_records += day_records
+            created_at = datetime.now().isoformat()
+            records = [transform_wellness_record(r, athlete['id'], created_at) for r in wellness_data]
+            for i in range(0, len(records), WELLNESS_INSERT_BATCH):
+                chunk = records[i:i + WELLNESS_INSERT_BATCH]
+                if insert_wellness_to_supabase(chunk, dry_run):
+                    total_records += len(chunk)
+                    dates_with_data.update(r['date'] for r in chunk if r.get('date'))
 
-        current += timedelta(days=1)
+    days_with_data = len(dates_with_data)
 
-    stats['wellness_days_imported'] = days_with_data
+    with STATS_LOCK:
+        stats['wellness_days_imported'] = days_with_data
 
     log(f"\n{Colors.BOLD}Historical Wellness Summary:{Colors.END}")
     log(f"  Date range: {oldest_date} → {newest_date} ({total_days} days)")
@@ -2035,8 +3262,67 @@ def import_wellness_date_range(athletes: List[Dict], oldest_date: str, newest_da
     log(f"  Total records imported: {total_records}")
 
 
+# Passe à False (pour le reste du processus) si la RPC n'est pas déployée
+_refresh_all_views_available = True
+
+def _refresh_view_rpc(rpc: str, label: str, timeout: int, warn_404: bool = True,
+                      params: Optional[dict] = None) -> Optional[int]:
+    """Appeler une RPC de refresh; renvoie le code HTTP (None si erreur réseau)"""
+    try:
+        print(f"{Colors.BLUE}Refreshing {label.lower()}...{Colors.END}")
+        response = SUPABASE_SESSION.post(
+            f"{SUPABASE_URL}/rest/v1/rpc/{rpc}",
+            data=orjson.dumps(params) if params else None,
+            timeout=timeout
+        )
+    except Exception as e:
+        print(f"{Colors.YELLOW} Could not refresh {label.lower()}: {e}{Colors.END}")
+        return None
+    if response.status_code in (200, 204):
+        print(f"{Colors.GREEN}{label} refreshed{Colors.END}")
+    elif response.status_code != 404 or warn_404:
+        print(f"{Colors.YELLOW} {label} refresh returned status {response.status_code}{Colors.END}")
+    return response.status_code
+
+
+def refresh_materialized_views(zone_views: bool = True):
+    """
+    Refresh activity_summary + weekly_zone_time after an import.
+
+    One call to refresh_all_views() (both views CONCURRENTLY, see
+    migrations/create_refresh_all_views_rpc.sql); falls back to the two
+    separate RPCs when it is not deployed.
+
+    Args:
+        zone_views: False skips weekly_zone_time (no records inserted in
+            this run: zone time cannot have changed)
+    """
+    global _refresh_all_views_available
+    flush_log()
+    print()
+    if not zone_views:
+        print(f"{Colors.BLUE}No records inserted: zone time views unchanged, skipped{Colors.END}")
+
+    if _refresh_all_views_available:
+        # Zone views may take longer (processing 2.5M+ rows)
+        status = _refresh_view_rpc(
+            "refresh_all_views", "Materialized views", timeout=360 if zone_views else 60,
+            warn_404=False, params=None if zone_views else {"p_zone_views": False}
+        )
+        if status != 404:
+            print()
+            return
+        _refresh_all_views_available = False
+
+    _refresh_view_rpc("refresh_activity_summary", "Activity summary view", timeout=60)
+    if zone_views:
+        _refresh_view_rpc("refresh_all_zone_views", "Zone time views", timeout=300)
+    print()
+
+
 def print_summary():
     """Résumé final (Phase 1 Enhanced)"""
+    flush_log()
     print(f"\n{Colors.BLUE}{'='*70}{Colors.END}")
     print(f"{Colors.BOLD}RÉSUMÉ FINAL{Colors.END}")
     print(f"{Colors.BLUE}{'='*70}{Colors.END}\n")
@@ -2117,9 +3403,36 @@ def main():
     # Bulk import optimization
     parser.add_argument('--skip-weather', action='store_true',
                         help="Skip weather/air quality API calls (for bulk historical import)")
+    parser.add_argument('--weather-cache', action='store_true',
+                        help="Persist Open-Meteo archive responses on disk across runs "
+                             "(WEATHER_CACHE_PATH, default ~/.cache/ins_dashboard/weather.sqlite)")
+    parser.add_argument('--parallel-athletes', type=int, default=1,
+                        help="Process up to N athletes in parallel worker processes (default: 1)")
+    parser.add_argument('--activity-workers', type=int, default=8,
+                        help="Process up to N activities per athlete concurrently in threads "
+                             "(default: 8, 1 = sequential)")
+    parser.add_argument('--jitter-seconds', type=int, default=0,
+                        help="Sleep a random 0-N seconds before starting (cron: avoid top-of-hour "
+                             "Open-Meteo peaks, e.g. 300)")
+    # Output verbosity
+    parser.add_argument('--quiet', action='store_true',
+                        help="Only log warnings/errors and the final summary (CI, log sinks)")
 
     args = parser.parse_args()
 
+    global QUIET, WEATHER_CACHE_PATH
+    QUIET = args.quiet
+    if args.weather_cache and not WEATHER_CACHE_PATH:
+        WEATHER_CACHE_PATH = WEATHER_CACHE_DEFAULT_PATH
+        os.makedirs(os.path.dirname(WEATHER_CACHE_PATH), exist_ok=True)
+
+    # Fail fast before any Intervals.icu/Open-Meteo work if Supabase isn't configured
+    missing_env = [name for name, value in (("SUPABASE_URL", SUPABASE_URL),
+                                            ("SUPABASE_SERVICE_ROLE_KEY", SUPABASE_KEY)) if not value]
+    if missing_env:
+        print(f"{Colors.RED}Variables d'environnement manquantes: {', '.join(missing_env)}{Colors.END}")
+        return 1
+
     print(f"\n{Colors.BOLD}{'='*70}")
     print("INTÉGRATION HYBRIDE INTERVALS.ICU → SUPABASE")
     print(f"{'='*70}{Colors.END}\n")
@@ -2127,6 +3440,12 @@ def main():
     if args.dry_run:
         print(f"{Colors.YELLOW} MODE DRY-RUN{Colors.END}\n")
 
+    # Décaler le départ (runs cron à :00 synchronisés sur Open-Meteo)
+    if args.jitter_seconds > 0:
+        delay = random.uniform(0, args.jitter_seconds)
+        print(f"Jitter: démarrage dans {delay:.0f}s\n")
+        time.sleep(delay)
+
     # Handle backfill-only mode
     if args.backfill_only:
         print(f"{Colors.BLUE}Mode: Weather backfill only (skipping activity import){Colors.END}")
@@ -2151,8 +3470,31 @@ def main():
     if not athletes:
         return 1
 
-    for athlete in athletes:
-        process_athlete(athlete, args.oldest, args.newest, args.dry_run, args.skip_weather)
+    # Import wellness data in the background while activities are processed
+    # (disjoint tables, both I/O-bound on Intervals.icu + Supabase)
+    # If historical dates provided, import date range; otherwise import today only
+    with ThreadPoolExecutor(max_workers=1) as wellness_executor:
+        if args.wellness_oldest and args.wellness_newest:
+            wellness_future = wellness_executor.submit(
+                import_wellness_date_range, athletes, args.wellness_oldest, args.wellness_newest, args.dry_run
+            )
+        else:
+            # Import today's wellness for ALL athletes (regardless of activities)
+            today = datetime.now().strftime("%Y-%m-%d")
+            wellness_future = wellness_executor.submit(import_wellness_for_date, athletes, today, args.dry_run)
+
+        if args.parallel_athletes > 1 and len(athletes) > 1:
+            process_athletes_parallel(
+                athletes, args.oldest, args.newest, args.dry_run, args.skip_weather,
+                workers=min(args.parallel_athletes, len(athletes)),
+                activity_workers=args.activity_workers
+            )
+        else:
+            for athlete in athletes:
+                process_athlete(athlete, args.oldest, args.newest, args.dry_run, args.skip_weather,
+                                args.activity_workers)
+
+        wellness_future.result()
 
     print_summary()
 
@@ -2164,56 +3506,9 @@ def main():
             dry_run=False
         )
 
-    # Import wellness data
-    # If historical dates provided, import date range; otherwise import today only
-    if args.wellness_oldest and args.wellness_newest:
-        import_wellness_date_range(athletes, args.wellness_oldest, args.wellness_newest, args.dry_run)
-    else:
-        # Import today's wellness for ALL athletes (regardless of activities)
-        today = datetime.now().strftime("%Y-%m-%d")
-        import_wellness_for_date(athletes, today, args.dry_run)
-
     # Phase 2: Refresh materialized views after data import
     if not args.dry_run and stats['activities_processed'] > 0:
-        # Refresh activity summary view
-        try:
-            print(f"\n{Colors.BLUE}Refreshing activity summary view...{Colors.END}")
-            refresh_url = f"{SUPABASE_URL}/rest/v1/rpc/refresh_activity_summary"
-            response = requests.post(
-                refresh_url,
-                headers={
-                    "apikey": SUPABASE_KEY,
-                    "Authorization": f"Bearer {SUPABASE_KEY}",
-                    "Content-Type": "application/json"
-                },
-                timeout=60
-            )
-            if response.status_code in (200, 204):
-                print(f"{Colors.GREEN}Activity summary view refreshed{Colors.END}")
-            else:
-                print(f"{Colors.YELLOW} View refresh returned status {response.status_code}{Colors.END}")
-        except Exception as e:
-            print(f"{Colors.YELLOW} Could not refresh activity summary view: {e}{Colors.END}")
-
-        # Refresh zone time views (activity_zone_time + weekly_zone_time)
-        try:
-            print(f"{Colors.BLUE}Refreshing zone time views...{Colors.END}")
-            refresh_url = f"{SUPABASE_URL}/rest/v1/rpc/refresh_all_zone_views"
-            response = requests.post(
-                refresh_url,
-                headers={
-                    "apikey": SUPABASE_KEY,
-                    "Authorization": f"Bearer {SUPABASE_KEY}",
-                    "Content-Type": "application/json"
-                },
-                timeout=300  # Zone views may take longer (processing 2.5M+ rows)
-            )
-            if response.status_code in (200, 204):
-                print(f"{Colors.GREEN}Zone time views refreshed{Colors.END}\n")
-            else:
-                print(f"{Colors.YELLOW} Zone view refresh returned status {response.status_code}{Colors.END}\n")
-        except Exception as e:
-            print(f"{Colors.YELLOW} Could not refresh zone views: {e}{Colors.END}\n")
+        refresh_materialized_views(zone_views=stats['records_inserted'] > 0)
 
     # Return 0 (success) even when no new activities - that's expected for daily cron
     # Only return 1 if there were actual failures
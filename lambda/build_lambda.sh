@@ -22,7 +22,7 @@ rm -f lambda_deployment.zip
 mkdir -p package/
 
 echo ""
-echo "Step 1a: Installing pandas/numpy for Lambda (Linux x86_64)..."
+echo "Step 1a: Installing pandas/numpy/orjson/ijson for Lambda (Linux x86_64)..."
 pip install --target package/ \
     --platform manylinux2014_x86_64 \
     --implementation cp \
@@ -30,6 +30,8 @@ pip install --target package/ \
     --only-binary=:all: \
     pandas \
     numpy \
+    orjson \
+    ijson \
     --quiet
 
 echo ""
@@ -38,6 +40,7 @@ pip install --target package/ \
     requests \
     python-dotenv \
     fitparse \
+    fitdecode \
     boto3 \
     --quiet
 
@@ -10,7 +10,11 @@ Triggered by:
 import json
 import os
 import sys
+import queue
 import subprocess
+import threading
+import time
+from collections import deque
 from datetime import datetime, timedelta
 
 # Add current directory to path for local imports
@@ -22,6 +26,68 @@ from aws_secrets_loader import load_all_secrets, save_athletes_json
 # Set this in Lambda environment variables as REFRESH_TOKEN
 REFRESH_TOKEN = os.environ.get('REFRESH_TOKEN', '')
 
+# Print a STALLED marker when an ingestion subprocess is silent this long
+STALL_WARNING_SEC = 60
+
+
+def run_ingestion(cmd, timeout):
+    """
+    Run an ingestion subprocess, streaming its output line by line.
+
+    Lines are echoed to CloudWatch as they arrive (prefixed with elapsed
+    seconds) instead of being buffered until the athlete finishes, and a
+    STALLED marker is printed when the child goes quiet.
+
+    Returns:
+        (returncode, output_tail) - returncode is None on timeout
+    """
+    proc = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1,
+        env=os.environ.copy(),
+        cwd=os.path.dirname(__file__)
+    )
+
+    lines = queue.Queue()
+
+    def _reader():
+        for line in iter(proc.stdout.readline, ''):
+            lines.put(line)
+        lines.put(None)
+
+    threading.Thread(target=_reader, daemon=True).start()
+
+    tail = deque(maxlen=20)
+    start = time.monotonic()
+    last_output = start
+
+    while True:
+        now = time.monotonic()
+        if now - start > timeout:
+            proc.kill()
+            proc.wait()
+            return None, ''.join(tail)
+
+        try:
+            line = lines.get(timeout=1)
+        except queue.Empty:
+            if time.monotonic() - last_output > STALL_WARNING_SEC:
+                print(f"  [{time.monotonic() - start:6.1f}s] STALLED: no output for {STALL_WARNING_SEC}s")
+                last_output = time.monotonic()
+            continue
+
+        if line is None:
+            break
+
+        last_output = time.monotonic()
+        tail.append(line)
+        print(f"  [{last_output - start:6.1f}s] {line}", end='')
+
+    return proc.wait(), ''.join(tail)
+
 
 def lambda_handler(event, context):
     """Main Lambda entry point."""
@@ -126,6 +192,7 @@ def lambda_handler(event, context):
             # Build command - note: using /tmp for athletes.json.local
             cmd = [
                 sys.executable,
+                '-u',  # Unbuffered so output streams as it is produced
                 os.path.join(os.path.dirname(__file__), 'intervals_hybrid_to_supabase.py'),
                 '--athlete', name,
                 '--oldest', oldest,
@@ -134,26 +201,18 @@ def lambda_handler(event, context):
             ]
 
             # Run with timeout (5 min per athlete)
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=300,
-                env=os.environ.copy(),
-                cwd=os.path.dirname(__file__)
-            )
-
-            if result.returncode == 0:
+            returncode, output_tail = run_ingestion(cmd, timeout=300)
+
+            if returncode is None:
+                results.append({'athlete': name, 'status': 'timeout'})
+                print(f"  TIMEOUT: {name}")
+            elif returncode == 0:
                 results.append({'athlete': name, 'status': 'success'})
                 print(f"  SUCCESS: {name}")
             else:
-                error_msg = result.stderr[:500] if result.stderr else result.stdout[:500]
+                error_msg = output_tail[-500:]
                 results.append({'athlete': name, 'status': 'failed', 'error': error_msg})
                 print(f"  FAILED: {name} - {error_msg[:100]}")
-
-        except subprocess.TimeoutExpired:
-            results.append({'athlete': name, 'status': 'timeout'})
-            print(f"  TIMEOUT: {name}")
         except Exception as e:
             results.append({'athlete': name, 'status': 'error', 'error': str(e)})
             print(f"  ERROR: {name} - {e}")
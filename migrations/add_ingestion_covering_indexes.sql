@@ -0,0 +1,22 @@
+-- =============================================================================
+-- Migration: Covering indexes for ingestion queries
+-- Purpose: Indexes for the per-run lookups in intervals_hybrid_to_supabase.py
+-- Created: October 17, 2026
+--
+-- Base-table indexes used by the view refreshes already exist
+-- (idx_activity_metadata_athlete_date, idx_wellness_athlete_date), and the
+-- unique index on activity_summary is created in
+-- refresh_activity_summary_concurrently.sql.
+--
+-- The duplicate check (get_existing_activity_ids) filters on
+-- activity_id=in.(...), which the UNIQUE(activity_id) index already serves.
+--
+-- Verify with:
+--   EXPLAIN (ANALYZE, BUFFERS)
+--   SELECT activity_id FROM activity_metadata
+--   WHERE weather_source = 'forecast' AND date >= CURRENT_DATE - 7;
+-- =============================================================================
+
+-- Weather backfill: forecast-only rows in a recent date window (small, partial)
+CREATE INDEX IF NOT EXISTS idx_activity_metadata_forecast_date
+ON activity_metadata(date) WHERE weather_source = 'forecast';
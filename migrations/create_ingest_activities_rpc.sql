@@ -0,0 +1,72 @@
+-- =============================================================================
+-- Migration: Multi-activity ingestion RPC
+-- Purpose: Ingest several activities in ONE request
+-- Created: October 17, 2026
+--
+-- intervals_hybrid_to_supabase.py called ingest_activity() once per activity.
+-- It now sends each window of activities through ingest_activities(), in
+-- request bodies of up to ~4 MB. Each activity runs in its own subtransaction:
+-- a failing activity is reported in the error column and the others are
+-- kept. The script retries failed activities one by one, and falls back to
+-- ingest_activity() when this function is not deployed.
+--
+-- Requires: migrations/create_ingest_activity_rpc.sql
+-- =============================================================================
+
+-- =============================================================================
+-- Function: ingest_activities
+-- Usage: SELECT * FROM ingest_activities('[{"p_metadata": {...},
+--                                           "p_records": [...],
+--                                           "p_intervals": [...]}, ...]'::jsonb);
+-- Called by: intervals_hybrid_to_supabase.py (insert_activities_to_supabase)
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION ingest_activities(p_activities JSONB)
+RETURNS TABLE (
+    activity_id TEXT,
+    records_inserted INTEGER,
+    intervals_inserted INTEGER,
+    error TEXT
+) AS $$
+DECLARE
+    v_item JSONB;
+BEGIN
+    FOR v_item IN SELECT value FROM jsonb_array_elements(p_activities) LOOP
+        activity_id := v_item->'p_metadata'->>'activity_id';
+        error := NULL;
+        BEGIN
+            SELECT i.records_inserted, i.intervals_inserted
+            INTO records_inserted, intervals_inserted
+            FROM ingest_activity(
+                v_item->'p_metadata',
+                COALESCE(v_item->'p_records', '[]'::jsonb),
+                COALESCE(v_item->'p_intervals', '[]'::jsonb)
+            ) AS i;
+        EXCEPTION WHEN OTHERS THEN
+            -- Only this activity is rolled back
+            records_inserted := 0;
+            intervals_inserted := 0;
+            error := SQLERRM;
+        END;
+        RETURN NEXT;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+COMMENT ON FUNCTION ingest_activities(JSONB) IS
+'Runs ingest_activity() for each {p_metadata, p_records, p_intervals} element,
+one subtransaction per activity. Returns one row per activity (error is NULL
+on success). Called by the ingestion script.';
+
+-- Only the service role (ingestion) may call it
+REVOKE EXECUTE ON FUNCTION ingest_activities(JSONB) FROM PUBLIC, anon, authenticated;
+
+-- =============================================================================
+-- Verification (run manually after migration)
+-- =============================================================================
+
+-- SELECT * FROM ingest_activities('[
+--     {"p_metadata": {"activity_id": "test_ingest_1", "athlete_id": "i344978", "type": "Run", "date": "2025-12-16"}},
+--     {"p_metadata": {"activity_id": "test_ingest_2", "athlete_id": "i344978", "type": "Run", "date": "2025-12-17"}}
+-- ]'::jsonb);
+-- DELETE FROM activity_metadata WHERE activity_id IN ('test_ingest_1', 'test_ingest_2');
@@ -0,0 +1,132 @@
+-- =============================================================================
+-- Migration: Single-call activity ingestion RPC
+-- Purpose: Insert metadata + records + intervals and run the per-activity
+--          calculations in ONE request / ONE transaction
+-- Created: October 17, 2026
+--
+-- intervals_hybrid_to_supabase.py used to do one POST for metadata, one per
+-- 500-record batch, one for intervals, then two RPCs (zone time, monotony).
+-- ingest_activity() does all of it server-side, so a failed activity leaves
+-- nothing half-written. The script falls back to the batched path when this
+-- function is not deployed or for very large activities.
+--
+-- activity and activity_intervals have no natural unique key, so the
+-- function replaces the activity's existing rows instead of appending: a
+-- call replayed after a lost response (504, read timeout) leaves exactly
+-- one copy of the activity.
+-- =============================================================================
+
+-- =============================================================================
+-- Function: ingest_activity
+-- Usage: SELECT * FROM ingest_activity('{"activity_id": "i123", ...}'::jsonb,
+--                                      '[{...}, ...]'::jsonb, '[{...}]'::jsonb);
+-- Called by: intervals_hybrid_to_supabase.py (insert_to_supabase)
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION ingest_activity(
+    p_metadata JSONB,
+    p_records JSONB DEFAULT '[]'::jsonb,
+    p_intervals JSONB DEFAULT '[]'::jsonb
+) RETURNS TABLE (
+    records_inserted INTEGER,
+    intervals_inserted INTEGER
+) AS $$
+DECLARE
+    v_activity_id TEXT := p_metadata->>'activity_id';
+    v_cols TEXT;
+    v_updates TEXT;
+    v_records INTEGER := 0;
+    v_intervals INTEGER := 0;
+BEGIN
+    -- Step 1: Upsert activity_metadata on activity_id
+    -- Only the keys present in the payload are written (same as a PostgREST
+    -- merge-duplicates upsert), so absent fields keep their current value
+    SELECT string_agg(quote_ident(c.column_name), ', '),
+           string_agg(format('%1$I = EXCLUDED.%1$I', c.column_name), ', ')
+    INTO v_cols, v_updates
+    FROM information_schema.columns c
+    WHERE c.table_schema = 'public'
+      AND c.table_name = 'activity_metadata'
+      AND c.column_name <> 'id'
+      AND p_metadata ? c.column_name;
+
+    EXECUTE format(
+        'INSERT INTO activity_metadata (%s)
+         SELECT %s FROM jsonb_populate_record(NULL::activity_metadata, $1)
+         ON CONFLICT (activity_id) DO UPDATE SET %s',
+        v_cols, v_cols, v_updates
+    ) USING p_metadata;
+
+    -- Step 2: Records (normalized client-side: every record has the same keys)
+    -- Rows from an earlier call for this activity are replaced (idempotent)
+    IF jsonb_array_length(p_records) > 0 THEN
+        DELETE FROM activity WHERE activity_id = v_activity_id;
+
+        SELECT string_agg(quote_ident(c.column_name), ', ')
+        INTO v_cols
+        FROM information_schema.columns c
+        WHERE c.table_schema = 'public'
+          AND c.table_name = 'activity'
+          AND c.column_name <> 'id'
+          AND (p_records->0) ? c.column_name;
+
+        EXECUTE format(
+            'INSERT INTO activity (%s)
+             SELECT %s FROM jsonb_populate_recordset(NULL::activity, $1)',
+            v_cols, v_cols
+        ) USING p_records;
+        GET DIAGNOSTICS v_records = ROW_COUNT;
+    END IF;
+
+    -- Step 3: Intervals (replaced as well)
+    IF jsonb_array_length(p_intervals) > 0 THEN
+        DELETE FROM activity_intervals WHERE activity_id = v_activity_id;
+
+        SELECT string_agg(quote_ident(c.column_name), ', ')
+        INTO v_cols
+        FROM information_schema.columns c
+        WHERE c.table_schema = 'public'
+          AND c.table_name = 'activity_intervals'
+          AND c.column_name <> 'id'
+          AND (p_intervals->0) ? c.column_name;
+
+        EXECUTE format(
+            'INSERT INTO activity_intervals (%s)
+             SELECT %s FROM jsonb_populate_recordset(NULL::activity_intervals, $1)',
+            v_cols, v_cols
+        ) USING p_intervals;
+        GET DIAGNOSTICS v_intervals = ROW_COUNT;
+    END IF;
+
+    -- Step 4: Per-activity calculations (only for activities with records)
+    IF v_records > 0 THEN
+        PERFORM calculate_zone_time_for_activity(v_activity_id);
+
+        IF p_metadata ? 'date' AND p_metadata ? 'athlete_id' THEN
+            PERFORM calculate_monotony_strain_for_week(
+                p_metadata->>'athlete_id',
+                date_trunc('week', (p_metadata->>'date')::date)::date  -- Monday
+            );
+        END IF;
+    END IF;
+
+    RETURN QUERY SELECT v_records, v_intervals;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+COMMENT ON FUNCTION ingest_activity(JSONB, JSONB, JSONB) IS
+'Ingests one activity (metadata upsert, records and intervals replaced) and runs
+calculate_zone_time_for_activity / calculate_monotony_strain_for_week,
+all in a single transaction. Called by the ingestion script.';
+
+-- Only the service role (ingestion) may call it
+REVOKE EXECUTE ON FUNCTION ingest_activity(JSONB, JSONB, JSONB) FROM PUBLIC, anon, authenticated;
+
+-- =============================================================================
+-- Verification (run manually after migration)
+-- =============================================================================
+
+-- SELECT * FROM ingest_activity(
+--     '{"activity_id": "test_ingest", "athlete_id": "i344978", "type": "Run", "date": "2025-12-16"}'::jsonb
+-- );
+-- DELETE FROM activity_metadata WHERE activity_id = 'test_ingest';
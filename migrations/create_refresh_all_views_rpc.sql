@@ -0,0 +1,57 @@
+-- =============================================================================
+-- Migration: Single refresh RPC for all materialized views
+-- Purpose: Refresh activity_summary and weekly_zone_time in ONE request
+-- Created: October 17, 2026
+--
+-- intervals_hybrid_to_supabase.py used to call refresh_activity_summary()
+-- and then refresh_all_zone_views(), two sequential requests at the end of
+-- every run. refresh_all_views() does both, CONCURRENTLY, so dashboard reads
+-- are never blocked. p_zone_views = false skips weekly_zone_time (the script
+-- passes it when a run inserted no records: only metadata changed, so zone
+-- time is unchanged). The script falls back to the two RPCs when this
+-- function is not deployed.
+--
+-- Requires: migrations/refresh_activity_summary_concurrently.sql
+--           (unique index on activity_summary) and
+--           migrations/create_activity_zone_time_incremental.sql
+--           (unique index on weekly_zone_time)
+-- =============================================================================
+
+-- =============================================================================
+-- Function: refresh_all_views
+-- Usage: SELECT refresh_all_views();
+--        SELECT refresh_all_views(p_zone_views => false);
+-- Called by: intervals_hybrid_to_supabase.py after each ingestion run
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION refresh_all_views(p_zone_views BOOLEAN DEFAULT TRUE)
+RETURNS void AS $$
+BEGIN
+    REFRESH MATERIALIZED VIEW CONCURRENTLY activity_summary;
+    IF p_zone_views THEN
+        REFRESH MATERIALIZED VIEW CONCURRENTLY weekly_zone_time;
+    END IF;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+COMMENT ON FUNCTION refresh_all_views(BOOLEAN) IS
+'Refreshes activity_summary and (unless p_zone_views is false) weekly_zone_time
+CONCURRENTLY (readers are never blocked). Called once after ingestion.';
+
+-- Only the service role (ingestion) may call it
+REVOKE EXECUTE ON FUNCTION refresh_all_views(BOOLEAN) FROM PUBLIC, anon, authenticated;
+
+-- =============================================================================
+-- Scheduling (optional): requires the pg_cron extension
+-- Keeps the views fresh even when an ingestion run skips its own refresh.
+-- =============================================================================
+
+-- CREATE EXTENSION IF NOT EXISTS pg_cron;
+--
+-- SELECT cron.schedule(
+--     'refresh-all-views',
+--     '*/15 * * * *',
+--     $$SELECT refresh_all_views()$$
+-- );
+--
+-- To remove: SELECT cron.unschedule('refresh-all-views');
@@ -0,0 +1,43 @@
+-- =============================================================================
+-- Migration: Batch zone time calculation RPC
+-- Purpose: Calculate zone time for many activities in ONE request
+-- Created: October 17, 2026
+--
+-- On the batched insert path, intervals_hybrid_to_supabase.py used to call
+-- calculate_zone_time_for_activity() once per activity (one round trip each).
+-- It now collects the inserted activity_ids and flushes them in chunks of
+-- 50 through calculate_zone_time_for_activities(). The script falls back to
+-- the per-activity RPC when this function is not deployed.
+-- =============================================================================
+
+-- =============================================================================
+-- Function: calculate_zone_time_for_activities
+-- Usage: SELECT * FROM calculate_zone_time_for_activities(ARRAY['i123', 'i456']);
+-- Called by: intervals_hybrid_to_supabase.py (calculate_zone_time_for_activities)
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION calculate_zone_time_for_activities(p_activity_ids TEXT[])
+RETURNS TABLE (
+    activity_id TEXT,
+    total_zone_minutes DECIMAL,
+    was_inserted BOOLEAN
+) AS $$
+    SELECT z.activity_id, z.total_zone_minutes, z.was_inserted
+    FROM unnest(p_activity_ids) AS ids(id)
+    CROSS JOIN LATERAL calculate_zone_time_for_activity(ids.id) AS z;
+$$ LANGUAGE sql SECURITY DEFINER SET search_path = public;
+
+COMMENT ON FUNCTION calculate_zone_time_for_activities(TEXT[]) IS
+'Runs calculate_zone_time_for_activity() for each activity_id in one call.
+Called by the ingestion script after an athlete''s activities are inserted.';
+
+-- Only the service role (ingestion) may call it
+REVOKE EXECUTE ON FUNCTION calculate_zone_time_for_activities(TEXT[]) FROM PUBLIC, anon, authenticated;
+
+-- =============================================================================
+-- Verification (run manually after migration)
+-- =============================================================================
+
+-- SELECT * FROM calculate_zone_time_for_activities(
+--     ARRAY(SELECT activity_id FROM activity_metadata ORDER BY date DESC LIMIT 3)
+-- );
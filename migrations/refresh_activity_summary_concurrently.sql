@@ -0,0 +1,48 @@
+-- =============================================================================
+-- Migration: Non-blocking refresh for activity_summary
+-- Purpose: Let the dashboard keep reading activity_summary while it refreshes
+-- Created: October 17, 2026
+--
+-- A plain REFRESH MATERIALIZED VIEW takes an ACCESS EXCLUSIVE lock, so every
+-- dashboard query on activity_summary stalls until the rebuild finishes.
+-- CONCURRENTLY swaps in the new rows without blocking readers, but requires
+-- a unique index on the view.
+-- =============================================================================
+
+-- Unique index required for CONCURRENTLY refresh
+CREATE UNIQUE INDEX IF NOT EXISTS idx_activity_summary_pk
+ON activity_summary(activity_id);
+
+-- =============================================================================
+-- Function: refresh_activity_summary
+-- Purpose: Refresh activity_summary without blocking dashboard reads
+-- Usage: SELECT refresh_activity_summary();
+-- Called by: intervals_hybrid_to_supabase.py after each ingestion run
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION refresh_activity_summary()
+RETURNS void AS $$
+BEGIN
+    REFRESH MATERIALIZED VIEW CONCURRENTLY activity_summary;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+COMMENT ON FUNCTION refresh_activity_summary() IS
+'Refreshes activity_summary CONCURRENTLY (readers are never blocked).
+Called after each ingestion run (pg_cron scheduling is optional, see below).';
+
+-- =============================================================================
+-- Scheduling (optional): requires the pg_cron extension
+-- Enable it in Supabase: Database > Extensions > pg_cron
+-- Keeps the view fresh even when an ingestion run skips its own refresh.
+-- =============================================================================
+
+-- CREATE EXTENSION IF NOT EXISTS pg_cron;
+--
+-- SELECT cron.schedule(
+--     'refresh-activity-summary',
+--     '*/15 * * * *',
+--     $$SELECT refresh_activity_summary()$$
+-- );
+--
+-- To remove: SELECT cron.unschedule('refresh-activity-summary');
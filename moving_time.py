@@ -69,6 +69,39 @@ def haversine_distance(
     return R * c
 
 
+def haversine_distances(lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """
+    Distances Haversine entre points GPS consécutifs, en une passe NumPy.
+
+    Args:
+        lats, lngs: Coordonnées (degrés), NaN si absentes
+
+    Returns:
+        Distances en mètres (même longueur; 0 pour le premier point et
+        pour toute paire dont une coordonnée est NaN)
+    """
+    R = 6371000  # Rayon de la Terre en mètres
+
+    distances = np.zeros(len(lats))
+    if len(lats) < 2:
+        return distances
+
+    lat_rad = np.radians(lats)
+    lon_rad = np.radians(lngs)
+
+    dlat = np.diff(lat_rad)
+    dlon = np.diff(lon_rad)
+
+    a = (
+        np.sin(dlat / 2) ** 2
+        + np.cos(lat_rad[:-1]) * np.cos(lat_rad[1:]) * np.sin(dlon / 2) ** 2
+    )
+    c = 2 * np.arcsin(np.sqrt(a))
+
+    distances[1:] = np.nan_to_num(R * c, nan=0.0)
+    return distances
+
+
 # =============================================================================
 # CALCUL TEMPS ACTIF (STRAVA-LIKE)
 # =============================================================================
@@ -99,9 +132,47 @@ def compute_moving_time_strava(
     if df is None or df.empty:
         return pd.Series([], dtype=float)
 
-    n = len(df)
+    # Seules les colonnes lues par l'algorithme sont converties
+    columns = {
+        col: pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=float)
+        for col in MOVING_TIME_INPUTS
+        if col in df.columns
+    }
+    t_active = compute_moving_time_strava_arrays(columns, activity_type, n=len(df))
+    return pd.Series(t_active, index=df.index, dtype=float)
+
+
+# Colonnes utilisées par compute_moving_time_strava_arrays
+MOVING_TIME_INPUTS = (
+    'ts_offset_ms', 'time', 'enhanced_speed', 'velocity_smooth', 'speed',
+    'lat', 'lng', 'cadence'
+)
+
+
+def compute_moving_time_strava_arrays(
+    columns: dict[str, np.ndarray],
+    activity_type: str = "run",
+    n: Optional[int] = None
+) -> np.ndarray:
+    """
+    Même algorithme que compute_moving_time_strava, sur des colonnes NumPy.
+
+    Évite de construire un DataFrame quand les données sont déjà en
+    colonnes (ingestion: records convertis une fois en float64).
+
+    Args:
+        columns: {nom: tableau float64 (NaN si absent)}; une colonne absente
+            du dict est traitée comme absente du DataFrame
+        activity_type: Type d'activité (run, cycling, etc.)
+        n: Nombre de points (par défaut, longueur des colonnes)
+
+    Returns:
+        Temps actif cumulé (secondes), tableau de longueur n
+    """
+    if n is None:
+        n = len(next(iter(columns.values()))) if columns else 0
     if n < 2:
-        return pd.Series([0.0] * n, index=df.index, dtype=float)
+        return np.zeros(n)
 
     # Seuil de vitesse
     speed_threshold = SPEED_THRESHOLDS.get(
@@ -110,59 +181,53 @@ def compute_moving_time_strava(
     )
 
     # --- 1. Base temporelle (secondes) ---
-    if 'ts_offset_ms' in df.columns:
-        t_raw = pd.to_numeric(df['ts_offset_ms'], errors='coerce') / 1000.0
-    elif 'time' in df.columns:
-        t_raw = pd.to_numeric(df['time'], errors='coerce')
+    if 'ts_offset_ms' in columns:
+        t_raw = columns['ts_offset_ms'] / 1000.0
+    elif 'time' in columns:
+        t_raw = columns['time']
     else:
         # Pas de temps → tout 0
-        return pd.Series(np.zeros(n), index=df.index, dtype=float)
+        return np.zeros(n)
 
-    t_raw = t_raw.ffill().fillna(0.0)
-    t_raw = t_raw - t_raw.iloc[0]  # Normaliser à 0 au début
-    t_raw = t_raw.clip(lower=0.0)
+    t_raw = pd.Series(t_raw).ffill().fillna(0.0).to_numpy(dtype=float)
+    t_raw = np.clip(t_raw - t_raw[0], 0.0, None)  # Normaliser à 0 au début
 
     # Delta temps entre points consécutifs
-    dt = t_raw.diff().fillna(0.0).clip(lower=0.0).values
+    dt = np.clip(np.diff(t_raw, prepend=t_raw[0]), 0.0, None)
 
     # --- 2. Calcul de la vitesse ---
     # Priorité : colonnes de vitesse pré-calculées
     v = None
     for col in ('enhanced_speed', 'velocity_smooth', 'speed'):  # Ordre de priorité ajusté
-        if col in df.columns:
-            v_series = pd.to_numeric(df[col], errors='coerce')
-            if v_series.notna().any():  # Vérifier qu'il y a des valeurs non-nulles
-                v = v_series.fillna(0.0).values
+        if col in columns:
+            v_col = columns[col]
+            if not np.isnan(v_col).all():  # Vérifier qu'il y a des valeurs non-nulles
+                v = np.nan_to_num(v_col, nan=0.0)
                 break
 
     # Si pas de vitesse pré-calculée, on la calcule depuis lat/lng
     if v is None:
         has_coords = (
-            'lat' in df.columns
-            and 'lng' in df.columns
-            and df['lat'].notna().any()
-            and df['lng'].notna().any()
+            'lat' in columns
+            and 'lng' in columns
+            and not np.isnan(columns['lat']).all()
+            and not np.isnan(columns['lng']).all()
         )
 
         if has_coords:
-            lats = pd.to_numeric(df['lat'], errors='coerce').ffill().values
-            lngs = pd.to_numeric(df['lng'], errors='coerce').ffill().values
-
-            # Distance entre points consécutifs (Haversine)
-            distances = np.zeros(n)
-            for i in range(1, n):
-                if not (np.isnan(lats[i]) or np.isnan(lngs[i]) or np.isnan(lats[i-1]) or np.isnan(lngs[i-1])):
-                    distances[i] = haversine_distance(
-                        lats[i-1], lngs[i-1],
-                        lats[i], lngs[i]
-                    )
+            lats = pd.Series(columns['lat']).ffill().to_numpy(dtype=float)
+            lngs = pd.Series(columns['lng']).ffill().to_numpy(dtype=float)
+
+            # Distance entre points consécutifs (Haversine, vectorisée)
+            distances = haversine_distances(lats, lngs)
 
             # Vitesse = distance / temps
-            v = np.where(dt > 0, distances / dt, 0.0)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                v = np.where(dt > 0, distances / dt, 0.0)
         else:
             # Pas de coords ni de vitesse → on utilise cadence si dispo
-            if 'cadence' in df.columns:
-                cad = pd.to_numeric(df['cadence'], errors='coerce').fillna(0.0).values
+            if 'cadence' in columns:
+                cad = np.nan_to_num(columns['cadence'], nan=0.0)
                 # Heuristique : cadence > 1 spm = en mouvement
                 v = np.where(cad > 1.0, speed_threshold + 0.1, 0.0)
             else:
@@ -183,14 +248,20 @@ def compute_moving_time_strava(
     stop_starts = np.where(np.diff(np.concatenate(([False], is_stopped))))[0]
     stop_ends = np.where(np.diff(np.concatenate((is_stopped, [False]))))[0]
 
-    # Pour chaque séquence d'arrêt
-    for start_idx, end_idx in zip(stop_starts, stop_ends):
-        # Temps d'arrêt pour cette séquence
-        stop_duration = t_raw.iloc[end_idx] - t_raw.iloc[start_idx] if end_idx < n else 0
-
-        # Si arrêt court (< MIN_STOP_DURATION), le considérer comme mouvement
-        if 0 < stop_duration < MIN_STOP_DURATION:
-            moving[start_idx:end_idx+1] = True
+    # Temps d'arrêt de chaque séquence (toutes les séquences d'un coup)
+    n_seq = min(len(stop_starts), len(stop_ends))
+    seq_starts = stop_starts[:n_seq]
+    seq_ends = stop_ends[:n_seq]
+    stop_durations = t_raw[seq_ends] - t_raw[seq_starts]
+
+    # Si arrêt court (< MIN_STOP_DURATION), le considérer comme mouvement:
+    # on marque les plages [début, fin] via un tableau de différences
+    short = (stop_durations > 0) & (stop_durations < MIN_STOP_DURATION) & (seq_ends >= seq_starts)
+    if short.any():
+        marks = np.zeros(n + 1, dtype=np.int64)
+        np.add.at(marks, seq_starts[short], 1)
+        np.add.at(marks, seq_ends[short] + 1, -1)
+        moving |= np.cumsum(marks[:n]) > 0
 
     # --- 4. Calcul du temps actif cumulé ---
     dt_active = np.where(moving, dt, 0.0)
@@ -199,7 +270,7 @@ def compute_moving_time_strava(
     # Garantir que le premier point est à 0
     t_active[0] = 0.0
 
-    return pd.Series(t_active, index=df.index, dtype=float)
+    return t_active
 
 
 # =============================================================================
@@ -0,0 +1,28 @@
+"""Le cache disque Open-Meteo ne doit jamais faire échouer la météo"""
+
+import orjson
+
+import intervals_hybrid_to_supabase as ingest
+
+PAYLOAD = {"hourly": {"time": ["2024-01-01T10:00"], "temperature_2m": [1.5]}}
+
+
+class FakeResponse:
+    content = orjson.dumps(PAYLOAD)
+
+    def raise_for_status(self):
+        pass
+
+
+def test_archive_payload_returned_when_cache_unwritable(tmp_path, monkeypatch):
+    # Répertoire inexistant: sqlite3.connect lève OperationalError
+    monkeypatch.setattr(ingest, "WEATHER_CACHE_PATH", str(tmp_path / "missing" / "weather.sqlite"))
+    monkeypatch.setattr(ingest, "_weather_cache_conn", None)
+    monkeypatch.setattr(ingest.HTTP_SESSION, "get", lambda *args, **kwargs: FakeResponse())
+
+    params = {
+        "latitude": 45.5, "longitude": -73.6,
+        "start_date": "2024-01-01", "end_date": "2024-01-01",
+        "hourly": ingest.WEATHER_PARAMS_BASE["hourly"],
+    }
+    assert ingest.fetch_open_meteo_archive(ingest.OM_ARCHIVE_URL, params, timeout=1) == PAYLOAD